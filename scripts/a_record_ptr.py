@@ -159,7 +159,7 @@ class InfobloxSession:
             "_is_total_size_needed": "true",
             "_limit": str(limit),
             "_offset": "0",
-            "_fields": ""
+            "_fields": "id,name"
         }
         resp = self.session.get(url, headers=self._auth_headers(), params=params)
         resp.raise_for_status()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+import os
+import csv
+import sys
+import json
+import time
+import random
+import argparse
+import requests
+from infoblox_client import InfobloxSession, RateLimiter, run_concurrently
+
+REQUIRED_GROUPS = ("user", "act_admin")
+
+
+# ---------------- Onboarding Session ----------------
+class OnboardingSession(InfobloxSession):
+    def __init__(self, limiter=None):
+        super().__init__()
+        if limiter:
+            self.limiter = limiter
+        self._groups = None
+
+    def group_ids(self, max_retries=6):
+        """Resolve the required group IDs once per account and keep them for every user.
+
+        A freshly created account may not list its groups yet, so the lookup is
+        retried with backoff and never served from the response cache.
+        """
+        if self._groups is None:
+            for attempt in range(max_retries):
+                groups = self.get_json(f"{self.base_url}/v2/groups", ttl=0).get("results", [])
+                by_name = {g.get("name"): g["id"] for g in groups}
+                missing = [name for name in REQUIRED_GROUPS if name not in by_name]
+                if not missing:
+                    break
+                sleep_s = (2 ** attempt) + random.random()
+                print(f"⏳ Groups {missing} not visible in {self.account_id} yet; retrying in {sleep_s:.1f}s")
+                time.sleep(sleep_s)
+            else:
+                raise RuntimeError(f"❌ Could not find required groups {missing} in account {self.account_id}")
+            self._groups = [by_name[name] for name in REQUIRED_GROUPS]
+            print(f"✅ Groups for {self.account_id}: {self._groups}")
+        return self._groups
+
+    def find_user_id(self, email):
+        params = {"_filter": f'email=="{email}"'}
+        users = self.get_json(f"{self.base_url}/v2/users", params, ttl=0).get("results", [])
+        return users[0]["id"] if users else None
+
+    def create_user(self, name, email, max_retries=5):
+        payload = {
+            "name": name,
+            "email": email,
+            "type": "interactive",
+            "group_ids": self.group_ids()
+        }
+        for attempt in range(max_retries):
+            try:
+                resp = self.request("POST", f"{self.base_url}/v2/users", json=payload)
+                if resp.status_code == 409:
+                    print(f"⚠️ User {email} already exists in {self.account_id}.")
+                    user_id = self.find_user_id(email)
+                else:
+                    resp.raise_for_status()
+                    user_id = resp.json().get("result", {}).get("id")
+                    print(f"✅ User created: {email}")
+                if not user_id:
+                    raise RuntimeError(f"❌ User ID not found for {email}")
+                return user_id.split("/")[-1]
+            except requests.RequestException as e:
+                print(f"⚠️ {email}: attempt {attempt+1} failed: {e}")
+                time.sleep((2**attempt) + random.random())
+        raise RuntimeError(f"❌ User creation failed after retries: {email}")
+
+
+# ---------------- Roster ----------------
+def load_roster(path, default_account=None):
+    """Read a CSV roster with name,email[,sandbox_id] columns and group it by account."""
+    by_account = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            account = (row.get("sandbox_id") or default_account or "").strip()
+            if not account:
+                raise ValueError(f"No sandbox_id for {row.get('email')} and no default account")
+            by_account.setdefault(account, []).append((row["name"].strip(), row["email"].strip()))
+    return by_account
+
+
+def write_index(path, index):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def onboard(roster_path, output_path="user_ids.json", max_workers=8, default_account=None):
+    roster = load_roster(roster_path, default_account)
+    limiter = RateLimiter(rate=float(os.getenv("INFOBLOX_RATE_LIMIT", "10")))
+    index, failures = {}, {}
+
+    def onboard_account(account):
+        session = OnboardingSession(limiter)
+        session.login()
+        session.switch_account(account)
+        session.group_ids()
+        return run_concurrently(lambda p: session.create_user(*p), roster[account], max_workers=max_workers)
+
+    results, errors = run_concurrently(onboard_account, roster, max_workers=max(1, min(4, len(roster))))
+    for account, err in errors.items():
+        print(f"❌ Account {account}: {err}")
+        for _, email in roster[account]:
+            failures[email] = str(err)
+    for account, (created, failed) in results.items():
+        for (name, email), user_id in created.items():
+            index[email] = {"name": name, "user_id": user_id, "sandbox_id": account}
+        for (_, email), err in failed.items():
+            failures[email] = str(err)
+
+    write_index(output_path, index)
+    print(f"📝 {len(index)} user ID(s) saved to {output_path}; {len(failures)} failure(s).")
+    for email, err in sorted(failures.items()):
+        print(f"❌ {email}: {err}")
+    return index, failures
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create workshop users from a CSV roster.")
+    parser.add_argument("roster", help="CSV with name,email[,sandbox_id] columns")
+    parser.add_argument("--output", default="user_ids.json")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    default_account = None
+    if os.path.exists("sandbox_id.txt"):
+        with open("sandbox_id.txt") as f:
+            default_account = f.read().strip()
+
+    _, failures = onboard(args.roster, args.output, args.workers, default_account)
+    sys.exit(1 if failures else 0)
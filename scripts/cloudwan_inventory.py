@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+import json
+import time
+import hashlib
+import argparse
+import boto3
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from cloudwan_route_propagator import NM_REGION
+
+SECTIONS = ("core_network", "attachments", "connect_peers", "route_tables")
+# Fields that change on every read and would make every snapshot differ
+VOLATILE = {"CreatedAt", "UpdatedAt", "ResponseMetadata"}
+
+
+def _clean(obj):
+    if isinstance(obj, dict):
+        return {k: _clean(v) for k, v in obj.items() if k not in VOLATILE}
+    if isinstance(obj, list):
+        return [_clean(v) for v in obj]
+    return obj
+
+
+def _digest(section):
+    return hashlib.sha256(json.dumps(section, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# ---------------- Collect ----------------
+class InventoryCollector:
+    def __init__(self, core_network_id=None, session=None, max_workers=8):
+        self.session = session or boto3.session.Session()
+        self.nm = self.session.client("networkmanager", region_name=NM_REGION)
+        self.core_network_id = core_network_id or self._only_core_network()
+        self.max_workers = max_workers
+
+    def _only_core_network(self):
+        ids = [cn["CoreNetworkId"] for page in self.nm.get_paginator("list_core_networks").paginate()
+               for cn in page["CoreNetworks"]]
+        if len(ids) != 1:
+            raise RuntimeError(f"❌ Expected exactly one core network, found {len(ids)}; pass --core-network-id")
+        return ids[0]
+
+    def core_network(self):
+        return _clean(self.nm.get_core_network(CoreNetworkId=self.core_network_id)["CoreNetwork"])
+
+    def attachments(self):
+        out = {}
+        for page in self.nm.get_paginator("list_attachments").paginate(CoreNetworkId=self.core_network_id):
+            for att in page["Attachments"]:
+                out[att["AttachmentId"]] = _clean(att)
+        return out
+
+    def connect_peer(self, peer_id):
+        peer = self.nm.get_connect_peer(ConnectPeerId=peer_id)["ConnectPeer"]
+        return _clean(peer)
+
+    def connect_peer_ids(self):
+        return [p["ConnectPeerId"] for page in self.nm.get_paginator("list_connect_peers").paginate(
+                    CoreNetworkId=self.core_network_id) for p in page["ConnectPeers"]]
+
+    def route_tables(self, region, vpc_ids):
+        """All route tables of the attached VPCs in one region, paginated; routes sorted for stable diffs."""
+        ec2 = self.session.client("ec2", region_name=region)
+        out = {}
+        for page in ec2.get_paginator("describe_route_tables").paginate(
+                Filters=[{"Name": "vpc-id", "Values": sorted(vpc_ids)}]):
+            for rt in page["RouteTables"]:
+                routes = sorted(_clean(rt["Routes"]), key=lambda r: json.dumps(r, sort_keys=True))
+                out[rt["RouteTableId"]] = {"region": region, "vpc_id": rt["VpcId"], "routes": routes,
+                                           "associations": sorted(a.get("SubnetId") or "main"
+                                                                  for a in rt.get("Associations", []))}
+        return out
+
+    def collect(self):
+        start = time.perf_counter()
+        core = self.core_network()
+        regions = sorted({e["EdgeLocation"] for e in core.get("Edges", [])})
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            attachments_f = pool.submit(self.attachments)
+            peer_ids = self.connect_peer_ids()
+            peers = dict(zip(peer_ids, pool.map(self.connect_peer, peer_ids)))
+            attachments = attachments_f.result()
+
+            vpcs_by_region = {r: set() for r in regions}
+            for att in attachments.values():
+                if att.get("AttachmentType") == "VPC":
+                    arn = att["ResourceArn"]
+                    vpcs_by_region.setdefault(arn.split(":")[3], set()).add(arn.split("/")[-1])
+            regions = sorted(r for r, vpcs in vpcs_by_region.items() if vpcs)
+            route_tables = {}
+            for tables in pool.map(lambda r: self.route_tables(r, vpcs_by_region[r]), regions):
+                route_tables.update(tables)
+
+        snapshot = {"core_network": core, "attachments": attachments,
+                    "connect_peers": peers, "route_tables": route_tables}
+        snapshot["meta"] = {
+            "core_network_id": self.core_network_id,
+            "taken_at": datetime.now(timezone.utc).isoformat(),
+            "regions": regions,
+            "seconds": round(time.perf_counter() - start, 3),
+            "digests": {s: _digest(snapshot[s]) for s in SECTIONS},
+        }
+        print(f"📸 {len(attachments)} attachment(s), {len(peers)} connect peer(s), "
+              f"{len(route_tables)} route table(s) in {len(regions)} region(s) "
+              f"in {snapshot['meta']['seconds']}s")
+        return snapshot
+
+
+def bgp_details(snapshot):
+    """Same shape as the terraform bgp_peering_details output (first BGP configuration), keyed by connect peer id."""
+    out = {}
+    for peer_id, peer in snapshot["connect_peers"].items():
+        configs = peer.get("Configuration", {}).get("BgpConfigurations", [])
+        if configs:
+            bgp = configs[0]
+            out[peer_id] = {"aws_ip": bgp.get("CoreNetworkAddress"), "nios_ip": bgp.get("PeerAddress"),
+                            "aws_asn": bgp.get("CoreNetworkAsn"), "nios_asn": bgp.get("PeerAsn")}
+    return out
+
+
+# ---------------- Files ----------------
+def save(snapshot, path):
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=1, sort_keys=True, default=str)
+    print(f"💾 Inventory written to {path}")
+
+
+def load(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# ---------------- Diff ----------------
+def diff_inventories(old, new):
+    """{section: {"added": [...], "removed": [...], "changed": {...}}} for sections whose digests differ."""
+    out = {}
+    for section in SECTIONS:
+        if old["meta"]["digests"][section] == new["meta"]["digests"][section]:
+            continue
+        a, b = old[section], new[section]
+        if section == "core_network":
+            out[section] = {"changed": sorted(k for k in set(a) | set(b) if a.get(k) != b.get(k))}
+            continue
+        changed = {}
+        for key in sorted(set(a) & set(b)):
+            if a[key] == b[key]:
+                continue
+            if section == "route_tables":
+                old_r = {json.dumps(r, sort_keys=True) for r in a[key]["routes"]}
+                new_r = {json.dumps(r, sort_keys=True) for r in b[key]["routes"]}
+                changed[key] = {"-": sorted(old_r - new_r), "+": sorted(new_r - old_r)}
+            else:
+                changed[key] = sorted(k for k in set(a[key]) | set(b[key]) if a[key].get(k) != b[key].get(k))
+        out[section] = {"added": sorted(set(b) - set(a)), "removed": sorted(set(a) - set(b)), "changed": changed}
+    return out
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot and diff the Cloud WAN lab across all policy regions.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_snap = sub.add_parser("snapshot")
+    p_snap.add_argument("path")
+    p_snap.add_argument("--core-network-id", default=None)
+    p_snap.add_argument("--workers", type=int, default=8)
+    p_bgp = sub.add_parser("bgp")
+    p_bgp.add_argument("path")
+    p_diff = sub.add_parser("diff")
+    p_diff.add_argument("old")
+    p_diff.add_argument("new")
+    args = parser.parse_args()
+
+    if args.cmd == "snapshot":
+        save(InventoryCollector(args.core_network_id, max_workers=args.workers).collect(), args.path)
+    elif args.cmd == "bgp":
+        print(json.dumps(bgp_details(load(args.path)), indent=2))
+    else:
+        diff = diff_inventories(load(args.old), load(args.new))
+        for section, d in diff.items():
+            for key in d.get("added", []):
+                print(f"+ {section} {key}")
+            for key in d.get("removed", []):
+                print(f"- {section} {key}")
+            changed = d["changed"]
+            for key in changed:
+                print(f"~ {section} {key}" + (f": {changed[key]}" if isinstance(changed, dict) else ""))
+        print(f"🧮 {len(diff)} of {len(SECTIONS)} section(s) changed")
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+import re
+import json
+import time
+import argparse
+import ipaddress
+from tfvars import load_tfvars
+
+SEGMENT_TAG = "segment"
+_SEGMENT_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9]{0,63}$")
+
+# Lab defaults, mirroring terraform/modules/cloudwan/main.tf
+DEFAULT_LAYOUT = {
+    "inside_cidrs": ["10.60.0.0/16"],
+    "asn_ranges": ["64512-65534"],
+    "edges": {
+        "eu-central-1": {"asn": 64513, "inside_cidrs": ["10.60.1.0/24"]},
+        "us-east-1": {"asn": 64512, "inside_cidrs": ["10.60.2.0/24"]},
+    },
+    "segments": {
+        "dnsShared": {"description": "Shared DNS / NIOS-X", "share_with": ["vpcComm"]},
+        "vpcComm": {"description": "Spoke VPCs", "share_with": ["dnsShared"]},
+    },
+    "connect_segment": "dnsShared",
+}
+
+
+# ---------------- Inventory ----------------
+def inventory_from_tfvars(tfvars):
+    """[{name, region, segment}] for the lab: shared VPC → dnsShared, every spoke → vpcComm."""
+    vpcs = []
+    shared = tfvars.get("shared_vpc")
+    if shared:
+        vpcs.append({"name": shared["name"], "region": shared.get("region") or shared["az"][:-1],
+                     "segment": "dnsShared"})
+    for key, spoke in (tfvars.get("spokes") or {}).items():
+        vpcs.append({"name": spoke.get("name", key), "region": spoke["region"],
+                     "segment": spoke.get("segment", "vpcComm")})
+    return vpcs
+
+
+def resolve_vpc_ids(vpcs, session=None):
+    """Fill in missing VPC ids by looking the Name tag up with describe_vpcs, one call per region.
+
+    Returns the names that could not be resolved (none found, or more than one VPC with that name).
+    """
+    import boto3   # only needed for this lookup; policy generation itself stays offline
+    session = session or boto3.session.Session()
+    missing = {}
+    for vpc in vpcs:
+        if not vpc.get("id"):
+            missing.setdefault(vpc["region"], []).append(vpc)
+    unresolved = []
+    for region, wanted in sorted(missing.items()):
+        ec2 = session.client("ec2", region_name=region)
+        found = {}
+        resp = ec2.describe_vpcs(Filters=[{"Name": "tag:Name", "Values": [v["name"] for v in wanted]}])
+        for v in resp["Vpcs"]:
+            name = next((t["Value"] for t in v.get("Tags", []) if t["Key"] == "Name"), None)
+            found.setdefault(name, []).append(v["VpcId"])
+        for vpc in wanted:
+            ids = found.get(vpc["name"], [])
+            if len(ids) == 1:
+                vpc["id"] = ids[0]
+            else:
+                unresolved.append(f"{vpc['name']} ({region}: {len(ids)} match(es))")
+    return unresolved
+
+
+# ---------------- Compile ----------------
+def _rule(number, description, conditions, action):
+    return {"rule-number": number, "description": description, "conditions": conditions, "action": action}
+
+
+def compile_policy(vpcs, layout=DEFAULT_LAYOUT, per_vpc_rules=False):
+    """Build the core network policy document.
+
+    By default attachments are mapped by their `segment` tag with a single
+    tag-association rule, so the rule count does not grow with the number of
+    VPCs. per_vpc_rules=True reproduces the old one-resource-id-rule-per-VPC
+    layout (VPCs need an `id`) for comparison.
+    """
+    segments = layout["segments"]
+    shares, seen = [], set()
+    for name in sorted(segments):
+        for other in sorted(segments[name].get("share_with", [])):
+            # attachment-route sharing is bidirectional; emit each pair once
+            pair = tuple(sorted((name, other)))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            shares.append({"action": "share", "mode": "attachment-route", "segment": name, "share-with": [other]})
+
+    rules = []
+    if per_vpc_rules:
+        for n, vpc in enumerate(vpcs, start=1):
+            rules.append(_rule(n * 100, f"Map {vpc['name']} to {vpc['segment']}",
+                               [{"type": "resource-id", "operator": "equals", "value": vpc["id"]}],
+                               {"association-method": "constant", "segment": vpc["segment"]}))
+    else:
+        rules.append(_rule(100, f"Map attachments to the segment named by their '{SEGMENT_TAG}' tag",
+                           [{"type": "tag-exists", "key": SEGMENT_TAG}],
+                           {"association-method": "tag", "tag-value-of-key": SEGMENT_TAG}))
+    rules.append(_rule((len(rules) + 1) * 100, f"Map Connect peers (NIOS-X) to {layout['connect_segment']}",
+                       [{"type": "attachment-type", "operator": "equals", "value": "connect"}],
+                       {"association-method": "constant", "segment": layout["connect_segment"]}))
+
+    return {
+        "version": "2021.12",
+        "core-network-configuration": {
+            "vpn-ecmp-support": False,
+            "dns-support": True,
+            "security-group-referencing-support": False,
+            "inside-cidr-blocks": layout["inside_cidrs"],
+            "asn-ranges": layout["asn_ranges"],
+            "edge-locations": [{"location": loc, "asn": e["asn"], "inside-cidr-blocks": e["inside_cidrs"]}
+                               for loc, e in sorted(layout["edges"].items())],
+        },
+        "segments": [{"name": name, "description": s.get("description", ""),
+                      "require-attachment-acceptance": s.get("require_acceptance", False)}
+                     for name, s in sorted(segments.items())],
+        "segment-actions": shares,
+        "attachment-policies": rules,
+    }
+
+
+# ---------------- Validate ----------------
+def _asn_ok(asn, ranges):
+    for r in ranges:
+        lo, _, hi = r.partition("-")
+        if int(lo) <= asn <= int(hi or lo):
+            return True
+    return False
+
+
+def validate(policy, vpcs):
+    """Local consistency checks; returns a list of problems (empty when valid)."""
+    problems = []
+    cfg = policy["core-network-configuration"]
+    segments = {s["name"] for s in policy["segments"]}
+    edges = {e["location"]: e for e in cfg["edge-locations"]}
+    inside = [ipaddress.ip_network(c) for c in cfg["inside-cidr-blocks"]]
+
+    for name in segments:
+        if not _SEGMENT_NAME.match(name):
+            problems.append(f"segment name '{name}' must be alphanumeric and start with a letter")
+    for loc, edge in edges.items():
+        if not _asn_ok(edge["asn"], cfg["asn-ranges"]):
+            problems.append(f"edge {loc}: ASN {edge['asn']} outside {cfg['asn-ranges']}")
+        for cidr in edge.get("inside-cidr-blocks", []):
+            if not any(ipaddress.ip_network(cidr).subnet_of(i) for i in inside):
+                problems.append(f"edge {loc}: inside CIDR {cidr} not within {cfg['inside-cidr-blocks']}")
+    if len({e["asn"] for e in edges.values()}) != len(edges):
+        problems.append("edge ASNs must be unique")
+
+    for action in policy["segment-actions"]:
+        for name in [action["segment"], *action.get("share-with", [])]:
+            if name not in segments:
+                problems.append(f"segment action references unknown segment '{name}'")
+        if action["segment"] in action.get("share-with", []):
+            problems.append(f"segment '{action['segment']}' shares with itself")
+
+    numbers = [r["rule-number"] for r in policy["attachment-policies"]]
+    if len(set(numbers)) != len(numbers):
+        problems.append("attachment policy rule numbers must be unique")
+    for r in policy["attachment-policies"]:
+        if not 1 <= r["rule-number"] <= 65535:
+            problems.append(f"rule {r['rule-number']}: rule number out of range")
+        seg = r["action"].get("segment")
+        if seg and seg not in segments:
+            problems.append(f"rule {r['rule-number']}: unknown segment '{seg}'")
+
+    for vpc in vpcs:
+        if vpc["segment"] not in segments:
+            problems.append(f"VPC {vpc['name']}: segment '{vpc['segment']}' is not defined")
+        if vpc["region"] not in edges:
+            problems.append(f"VPC {vpc['name']}: region {vpc['region']} has no edge location")
+    return problems
+
+
+def report(policy):
+    doc = json.dumps(policy, separators=(",", ":"))
+    return {"rules": len(policy["attachment-policies"]), "segments": len(policy["segments"]),
+            "segment_actions": len(policy["segment-actions"]), "bytes": len(doc.encode())}
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and validate the Cloud WAN core network policy.")
+    parser.add_argument("--inventory", help='JSON: {"vpcs": [{name, region, segment[, id]}], optional layout keys}')
+    parser.add_argument("--tfvars", default="../terraform/terraform.tfvars")
+    parser.add_argument("--out", default="cloudwan_policy.json")
+    parser.add_argument("--per-vpc-rules", action="store_true", help="Old layout: one resource-id rule per VPC (ids missing from the inventory are "
+                             "looked up by Name tag with describe_vpcs)")
+    args = parser.parse_args()
+
+    layout = dict(DEFAULT_LAYOUT)
+    if args.inventory:
+        with open(args.inventory) as f:
+            inventory = json.load(f)
+        vpcs = inventory.pop("vpcs")
+        layout.update(inventory)
+    else:
+        vpcs = inventory_from_tfvars(load_tfvars(args.tfvars))
+
+    if args.per_vpc_rules and any(not v.get("id") for v in vpcs):
+        unresolved = resolve_vpc_ids(vpcs)
+        if unresolved:
+            raise SystemExit(f"❌ --per-vpc-rules needs a VPC id for every VPC; could not resolve "
+                             f"{', '.join(unresolved)} by Name tag (add \"id\" to the --inventory entries)")
+
+    start = time.perf_counter()
+    policy = compile_policy(vpcs, layout, per_vpc_rules=args.per_vpc_rules)
+    problems = validate(policy, vpcs)
+    elapsed = (time.perf_counter() - start) * 1000
+    for p in problems:
+        print(f"❌ {p}")
+    if problems:
+        raise SystemExit(1)
+
+    with open(args.out, "w") as f:
+        json.dump(policy, f, indent=2)
+    print(f"✅ {args.out}: {report(policy)} for {len(vpcs)} VPC(s), compiled+validated in {elapsed:.1f} ms")
+    if not args.per_vpc_rules:
+        print(f"🏷️ Tag each VPC attachment with {SEGMENT_TAG}=<segment> "
+              f"({', '.join(sorted({v['segment'] for v in vpcs}))})")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import argparse
+import threading
+import ipaddress
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+
+# Cloud WAN's Network Manager API is global and served from us-west-2.
+NM_REGION = "us-west-2"
+# {route table id: [CIDRs]} of the routes this propagator created; only those are ever deleted
+STATE_FILE = os.getenv("PROPAGATOR_STATE_FILE", "route_propagator_state.json")
+# never created or deleted here: the Connect inside CIDR (static route in terraform/main.tf)
+# and the anycast range route_monitor_lambda.py adds and withdraws on BGP events
+SKIP_CIDRS = [c.strip() for c in os.getenv("PROPAGATOR_SKIP_CIDRS", "10.60.0.0/16,192.168.0.0/16").split(",")
+              if c.strip()]
+
+
+def diff_route_table(routes, desired, target, owned):
+    """Compare one route table with the desired destination CIDRs.
+
+    Only routes that point at `target` (e.g. {"CoreNetworkArn": arn}) and that
+    this propagator created (`owned`) are deleted, so static or monitor-managed
+    core network routes survive; a desired CIDR already routed somewhere else
+    is a conflict and is left alone. Returns (creates, deletes, conflicts) as sets of CIDRs.
+    """
+    (key, value), = target.items()
+    ours, others = set(), set()
+    for r in routes:
+        cidr = r.get("DestinationCidrBlock")
+        if not cidr:
+            continue
+        (ours if r.get(key) == value else others).add(cidr)
+    return desired - ours - others, (ours & owned) - desired, desired & others
+
+
+def skipped(cidr, skip_nets):
+    net = ipaddress.ip_network(cidr)
+    return any(net.overlaps(s) for s in skip_nets)
+
+
+def desired_for_vpc(segment_routes, vpc_cidrs, own_attachment_ids):
+    """Active segment routes minus the VPC's own attachments and anything overlapping its CIDRs."""
+    own = [ipaddress.ip_network(c) for c in vpc_cidrs]
+    out = set()
+    for cidr, attachment_ids in segment_routes.items():
+        if attachment_ids & own_attachment_ids:
+            continue
+        net = ipaddress.ip_network(cidr)
+        if any(net.overlaps(o) for o in own):
+            continue
+        out.add(cidr)
+    return out
+
+
+class RoutePropagator:
+    def __init__(self, core_network_id, max_workers=8, dry_run=False, session=None, target_for=None,
+                 global_network_id=None, core_network_arn=None, verbose=True, state_path=None,
+                 skip_cidrs=SKIP_CIDRS):
+        self.session = session or boto3.session.Session()
+        self.nm = self.session.client("networkmanager", region_name=NM_REGION)
+        self.core_network_id = core_network_id
+        self.max_workers = max_workers
+        self.dry_run = dry_run
+        self.verbose = verbose
+        if not (global_network_id and core_network_arn):
+            core = self.nm.get_core_network(CoreNetworkId=core_network_id)["CoreNetwork"]
+            global_network_id, core_network_arn = core["GlobalNetworkId"], core["CoreNetworkArn"]
+        self.global_network_id = global_network_id
+        self.core_network_arn = core_network_arn
+        self.target_for = target_for or (lambda vpc: {"CoreNetworkArn": self.core_network_arn})
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+        self.skip_nets = [ipaddress.ip_network(c) for c in skip_cidrs]
+        # state_path=None keeps ownership in memory only (tests, benchmarks)
+        self.state_path = state_path
+        self.owned = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as f:
+                self.owned = {rt: set(cidrs) for rt, cidrs in json.load(f).items()}
+
+    def _count(self, n=1):
+        with self._calls_lock:
+            self.calls += n
+
+    def _save_state(self):
+        if not self.state_path or self.dry_run:
+            return
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({rt: sorted(c) for rt, c in sorted(self.owned.items()) if c}, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    # ---------------- Read ----------------
+    def vpc_attachments(self):
+        out = []
+        for page in self.nm.get_paginator("list_attachments").paginate(
+                CoreNetworkId=self.core_network_id, AttachmentType="VPC"):
+            self._count()
+            for att in page["Attachments"]:
+                if att.get("State") != "AVAILABLE":
+                    continue
+                arn = att["ResourceArn"]
+                out.append({
+                    "attachment_id": att["AttachmentId"],
+                    "segment": att["SegmentName"],
+                    "edge": att["EdgeLocation"],
+                    "region": arn.split(":")[3],
+                    "vpc_id": arn.split("/")[-1],
+                })
+        return out
+
+    def segment_routes(self, segment, edge):
+        """{cidr: {attachment ids}} for the ACTIVE routes of one segment at one edge location."""
+        self._count()
+        resp = self.nm.get_network_routes(
+            GlobalNetworkId=self.global_network_id,
+            RouteTableIdentifier={"CoreNetworkSegmentEdge": {
+                "CoreNetworkId": self.core_network_id, "SegmentName": segment, "EdgeLocation": edge}},
+            States=["ACTIVE"],
+        )
+        routes = {}
+        for r in resp.get("NetworkRoutes", []):
+            ids = {d.get("CoreNetworkAttachmentId") for d in r.get("Destinations", [])}
+            routes.setdefault(r["DestinationCidrBlock"], set()).update(ids)
+        return routes
+
+    def region_route_tables(self, region, vpc_ids):
+        """One paginated describe per region: {vpc_id: (vpc cidrs, [route tables])}."""
+        ec2 = self.session.client("ec2", region_name=region)
+        cidrs = {}
+        for page in ec2.get_paginator("describe_vpcs").paginate(VpcIds=list(vpc_ids)):
+            self._count()
+            for v in page["Vpcs"]:
+                cidrs[v["VpcId"]] = [a["CidrBlock"] for a in v.get("CidrBlockAssociationSet", [])] or [v["CidrBlock"]]
+        tables = {v: [] for v in vpc_ids}
+        for page in ec2.get_paginator("describe_route_tables").paginate(
+                Filters=[{"Name": "vpc-id", "Values": list(vpc_ids)}]):
+            self._count()
+            for rt in page["RouteTables"]:
+                tables[rt["VpcId"]].append(rt)
+        return ec2, {v: (cidrs.get(v, []), tables[v]) for v in vpc_ids}
+
+    # ---------------- Reconcile ----------------
+    def _apply_region(self, region, attachments, routes_by_segment_edge):
+        by_vpc = {}
+        for att in attachments:
+            by_vpc.setdefault(att["vpc_id"], []).append(att)
+        ec2, vpcs = self.region_route_tables(region, by_vpc)
+        stats = {"created": 0, "deleted": 0, "conflicts": 0}
+        # a VPC with several attachments gets one pass over its tables, with the union of their routes
+        for vpc_id, vpc_atts in by_vpc.items():
+            vpc_cidrs, tables = vpcs[vpc_id]
+            own_ids = {a["attachment_id"] for a in vpc_atts}
+            desired = set()
+            for att in vpc_atts:
+                desired |= desired_for_vpc(routes_by_segment_edge[(att["segment"], att["edge"])],
+                                           vpc_cidrs, own_ids)
+            desired = {c for c in desired if not skipped(c, self.skip_nets)}
+            target = self.target_for(vpc_id)
+            for rt in tables:
+                # each table belongs to one VPC, so only this thread touches its owned set
+                with self._calls_lock:
+                    owned = self.owned.setdefault(rt["RouteTableId"], set())
+                creates, deletes, conflicts = diff_route_table(rt["Routes"], desired, target, set(owned))
+                for cidr in sorted(conflicts):
+                    print(f"⚠️ {rt['RouteTableId']}: {cidr} already routed elsewhere; skipping")
+                stats["conflicts"] += len(conflicts)
+                for cidr in sorted(creates):
+                    if self.verbose:
+                        print(f"➕ {region} {rt['RouteTableId']}: {cidr}")
+                    if not self.dry_run:
+                        self._count()
+                        ec2.create_route(RouteTableId=rt["RouteTableId"], DestinationCidrBlock=cidr, **target)
+                        owned.add(cidr)
+                for cidr in sorted(deletes):
+                    if self.verbose:
+                        print(f"❌ {region} {rt['RouteTableId']}: {cidr}")
+                    if not self.dry_run:
+                        self._count()
+                        ec2.delete_route(RouteTableId=rt["RouteTableId"], DestinationCidrBlock=cidr)
+                        owned.discard(cidr)
+                stats["created"] += len(creates)
+                stats["deleted"] += len(deletes)
+        return stats
+
+    def reconcile(self, attachments=None):
+        start = time.perf_counter()
+        self.calls = 0
+        attachments = attachments if attachments is not None else self.vpc_attachments()
+        pairs = sorted({(a["segment"], a["edge"]) for a in attachments})
+        by_region = {}
+        for a in attachments:
+            by_region.setdefault(a["region"], []).append(a)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            seg_routes = dict(zip(pairs, pool.map(lambda p: self.segment_routes(*p), pairs)))
+            regions = sorted(by_region)
+            try:
+                results = dict(zip(regions, pool.map(
+                    lambda r: self._apply_region(r, by_region[r], seg_routes), regions)))
+            finally:
+                self._save_state()
+
+        total = {k: sum(r[k] for r in results.values()) for k in ("created", "deleted", "conflicts")}
+        total.update(regions=len(results), segment_tables=len(pairs), api_calls=self.calls,
+                     seconds=round(time.perf_counter() - start, 3))
+        print(f"✅ Route propagation: {total}")
+        return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Propagate Cloud WAN segment routes into attached VPC route tables.")
+    parser.add_argument("core_network_id")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--state", default=STATE_FILE, help="JSON file recording the routes this tool created")
+    parser.add_argument("--skip", nargs="*", default=SKIP_CIDRS, help="CIDRs never created or deleted here")
+    args = parser.parse_args()
+    RoutePropagator(args.core_network_id, max_workers=args.workers, dry_run=args.dry_run,
+                    state_path=args.state, skip_cidrs=args.skip).reconcile()
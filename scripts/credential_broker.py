@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+import os
+import re
+import json
+import fcntl
+import shlex
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+from infoblox_client import InfobloxSession, run_concurrently
+
+ENV_FILE = os.path.expanduser(os.getenv("INFOBLOX_ENV_FILE", "~/.infoblox.env"))
+CACHE_FILE = os.path.expanduser(os.getenv("INFOBLOX_CREDENTIAL_CACHE", "~/.infoblox_credentials.json"))
+_EXPORT = re.compile(r'^export\s+([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
+
+
+# ---------------- Files ----------------
+def _atomic_write(path, content, mode=0o600):
+    """Write content to a temp file in the same directory and rename it over path."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_env_file(path=ENV_FILE):
+    env = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                m = _EXPORT.match(line.strip())
+                if m:
+                    env[m.group(1)] = shlex.split(m.group(2))[0] if m.group(2) else ""
+    return env
+
+
+def update_env_file(values, path=ENV_FILE):
+    """Merge values into the env file and atomically replace it; also export them in-process.
+
+    The read-merge-replace runs under an exclusive lock on a sidecar file, so
+    concurrent writers (join_watcher, deploy_api_key, pool claims) keep each other's values.
+    """
+    os.environ.update(values)
+    fd = os.open(path + ".lock", os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        env = read_env_file(path)
+        env.update(values)
+        lines = [f"# Managed by credential_broker.py on {datetime.now(timezone.utc).isoformat()}"]
+        lines += [f"export {k}={shlex.quote(v)}" for k, v in sorted(env.items())]
+        _atomic_write(path, "\n".join(lines) + "\n")
+    finally:
+        os.close(fd)
+    print(f"💾 Wrote {len(values)} variable(s) to {path}")
+
+
+def ensure_sourced_from_bashrc(path=ENV_FILE):
+    """Add a single idempotent 'source' line to ~/.bashrc instead of appending exports each run."""
+    bashrc = os.path.expanduser("~/.bashrc")
+    line = f'[ -f "{path}" ] && . "{path}"'
+    if os.path.exists(bashrc):
+        with open(bashrc, "r") as f:
+            if any(l.strip() == line for l in f):
+                return
+    with open(bashrc, "a") as f:
+        f.write(f"\n{line}\n")
+    print(f"🔗 ~/.bashrc now sources {path}")
+
+
+# ---------------- Cache ----------------
+class CredentialCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+
+    def get(self, key, min_validity=timedelta(hours=1)):
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        expires = datetime.fromisoformat(entry["expires_at"].replace("Z", "+00:00"))
+        return entry["value"] if expires - datetime.now(timezone.utc) > min_validity else None
+
+    def put(self, key, value, expires_at):
+        self.entries[key] = {"value": value, "expires_at": expires_at}
+
+    def save(self):
+        now = datetime.now(timezone.utc)
+        self.entries = {k: v for k, v in self.entries.items()
+                        if datetime.fromisoformat(v["expires_at"].replace("Z", "+00:00")) > now}
+        _atomic_write(self.path, json.dumps(self.entries, indent=2, sort_keys=True))
+
+
+def expiry_in_days(days):
+    return (datetime.now(timezone.utc) + timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+# ---------------- Broker Session ----------------
+class CredentialBroker(InfobloxSession):
+    def __init__(self, cache=None):
+        super().__init__()
+        self.cache = cache or CredentialCache()
+
+    def _mint_join_token(self, name, ttl_days):
+        expires_at = expiry_in_days(ttl_days)
+        resp = self.request("POST", f"{self.base_url}/atlas-host-activation/v1/jointoken",
+                            json={"name": name, "expires_at": expires_at})
+        resp.raise_for_status()
+        data = resp.json()
+        token = data.get("join_token")
+        if not token:
+            raise RuntimeError(f"❌ Failed to extract join token for {name} from response.")
+        print(f"✅ Join token minted: {name}")
+        return token, data.get("result", {}).get("expires_at") or expires_at
+
+    def _mint_api_key(self, name, ttl_days):
+        expires_at = expiry_in_days(ttl_days)
+        resp = self.request("POST", f"{self.base_url}/v2/current_api_keys",
+                            json={"name": name, "expires_at": expires_at})
+        resp.raise_for_status()
+        key = resp.json().get("result", {}).get("key")
+        if not key:
+            raise RuntimeError(f"❌ Failed to extract API key {name} from response.")
+        print(f"✅ API key minted: {name} (expires {expires_at})")
+        return key, expires_at
+
+    def _batch(self, kind, names, mint, ttl_days, max_workers):
+        """Reuse unexpired cached credentials and mint the rest concurrently."""
+        out, missing = {}, []
+        for name in names:
+            cached = self.cache.get(f"{kind}:{self.account_id}:{name}")
+            if cached:
+                out[name] = cached
+            else:
+                missing.append(name)
+        print(f"🔁 {kind}: {len(out)} reused from cache, {len(missing)} to mint")
+        minted, errors = run_concurrently(lambda n: mint(n, ttl_days), missing, max_workers=max_workers)
+        for name, (value, expires_at) in minted.items():
+            self.cache.put(f"{kind}:{self.account_id}:{name}", value, expires_at)
+            out[name] = value
+        self.cache.save()
+        for name, err in errors.items():
+            print(f"❌ {kind} {name}: {err}")
+        if errors:
+            raise RuntimeError(f"❌ {len(errors)} {kind}(s) could not be minted")
+        return out
+
+    def join_tokens(self, names, ttl_days=30, max_workers=8):
+        return self._batch("join_token", names, self._mint_join_token, ttl_days, max_workers)
+
+    def api_keys(self, names, ttl_days=30, max_workers=4):
+        return self._batch("api_key", names, self._mint_api_key, ttl_days, max_workers)
+
+
+def env_for(join_tokens=None, api_key=None):
+    """Terraform-consumable variables: a single token as before, plus a JSON map for N hosts."""
+    env = {}
+    if join_tokens:
+        first = next(iter(join_tokens.values()))
+        env["INFOBLOX_JOIN_TOKEN"] = first
+        env["TF_VAR_infoblox_join_token"] = first
+        if len(join_tokens) > 1:
+            env["TF_VAR_infoblox_join_tokens"] = json.dumps(join_tokens, sort_keys=True)
+    if api_key:
+        env["TF_VAR_ddi_api_key"] = api_key
+    return env
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mint or reuse join tokens / API keys and write one env file.")
+    parser.add_argument("--hosts", nargs="*", default=["demo-token"], help="Join token names, one per host")
+    parser.add_argument("--api-key", default=None, help="API key name to mint or reuse")
+    parser.add_argument("--ttl-days", type=int, default=30)
+    parser.add_argument("--env-file", default=ENV_FILE)
+    parser.add_argument("--bashrc", action="store_true", help="Make ~/.bashrc source the env file (idempotent)")
+    args = parser.parse_args()
+
+    broker = CredentialBroker()
+    broker.login()
+    broker.switch_account()
+
+    tokens = broker.join_tokens(args.hosts, ttl_days=args.ttl_days) if args.hosts else {}
+    key = broker.api_keys([args.api_key], ttl_days=args.ttl_days)[args.api_key] if args.api_key else None
+    update_env_file(env_for(tokens, key), args.env_file)
+    if args.bashrc:
+        ensure_sourced_from_bashrc(args.env_file)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import sys
+from dataclasses import dataclass, fields
+
+
+class _Model:
+    """Slotted, read-only-by-convention view of one CSP object.
+
+    Attribute names are the API field names, and h["name"] / h.get("tags", {})
+    keep working so code written against raw dicts can switch to models as is.
+    Fields that were not requested (see InfobloxSession.iter_models) are None.
+    """
+    __slots__ = ()
+    PATH = ""
+    FIELDS = ()
+    INTERNED = ()   # low-cardinality reference fields (space, zone, ...) shared via sys.intern
+    _interned_idx = ()
+
+    @classmethod
+    def from_api(cls, obj):
+        values = [obj.get(f) for f in cls.FIELDS]
+        for i in cls._interned_idx:
+            if values[i] is not None:
+                values[i] = sys.intern(values[i])
+        return cls(*values)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_dict(self):
+        return {f: getattr(self, f) for f in self.FIELDS if getattr(self, f) is not None}
+
+
+def _model(path, interned=()):
+    def wrap(cls):
+        cls = dataclass(slots=True)(cls)
+        cls.PATH = path
+        cls.FIELDS = tuple(f.name for f in fields(cls))
+        cls.INTERNED = interned
+        cls._interned_idx = tuple(cls.FIELDS.index(f) for f in interned)
+        return cls
+    return wrap
+
+
+# ---------------- Models ----------------
+@_model("ipam/host")
+class Host(_Model):
+    id: str = None
+    name: str = None
+    addresses: list = None
+    host_names: list = None
+    comment: str = None
+    tags: dict = None
+
+
+@_model("ipam/range", interned=("space",))
+class Range(_Model):
+    id: str = None
+    space: str = None
+    start: str = None
+    end: str = None
+    comment: str = None
+    tags: dict = None
+
+
+@_model("ipam/subnet", interned=("space", "parent"))
+class Subnet(_Model):
+    id: str = None
+    space: str = None
+    parent: str = None
+    address: str = None
+    cidr: int = None
+    comment: str = None
+    tags: dict = None
+
+
+@_model("dns/auth_zone", interned=("view",))
+class Zone(_Model):
+    id: str = None
+    fqdn: str = None
+    view: str = None
+    comment: str = None
+    tags: dict = None
+
+
+@_model("dns/record", interned=("zone", "type", "view"))
+class Record(_Model):
+    id: str = None
+    zone: str = None
+    view: str = None
+    name_in_zone: str = None
+    absolute_name_spec: str = None
+    type: str = None
+    rdata: dict = None
+    dns_rdata: str = None
+    ipam_host: str = None   # the IPAM host that generated the record, if any
+    ttl: int = None
+    comment: str = None
+    tags: dict = None
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+import re
+import ipaddress
+
+MAX_FILTER_LEN = 1500   # keep the pushed-down _filter well inside URL length limits
+_PUSHABLE_PATH = re.compile(r"^[A-Za-z_]\w*(\.[A-Za-z_][\w-]*)*$")
+
+
+def quote(value):
+    """CSP _filter literal: strings double-quoted with backslash and quote escaped, numbers/bools bare."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def resolve(obj, path):
+    """Every value at a dotted path; lists fan out (addresses.address → each host address)."""
+    values = [obj]
+    for part in path.split("."):
+        out = []
+        for value in values:
+            for item in value if isinstance(value, list) else [value]:
+                child = item.get(part) if hasattr(item, "get") else None
+                if child is not None:
+                    out.extend(child if isinstance(child, list) else [child])
+        values = out
+    return values
+
+
+# ---------------- Predicates ----------------
+class Query:
+    """A predicate over CSP objects that can be sent as _filter, checked locally, or both.
+
+    cost is a rough guess at the fraction of a collection that matches; the
+    planner pushes the most selective predicates to the server first.
+    """
+    cost = 1.0
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def to_filter(self):
+        """CSP _filter text, or None when the server cannot evaluate this predicate."""
+        return None
+
+    def match(self, obj):
+        raise NotImplementedError
+
+    def fields(self):
+        """Top-level fields local evaluation needs (so _fields projections keep them)."""
+        return set()
+
+
+class _FieldQuery(Query):
+    def __init__(self, path, value):
+        self.path = path
+        self.value = value
+
+    def fields(self):
+        return {self.path.split(".")[0]}
+
+    def _pushable(self):
+        return bool(_PUSHABLE_PATH.match(self.path))
+
+
+class Cmp(_FieldQuery):
+    OPS = {
+        "==": (lambda a, b: a == b, 0.01),
+        "!=": (lambda a, b: a != b, 0.99),
+        "<": (lambda a, b: a < b, 0.5),
+        "<=": (lambda a, b: a <= b, 0.5),
+        ">": (lambda a, b: a > b, 0.5),
+        ">=": (lambda a, b: a >= b, 0.5),
+    }
+
+    def __init__(self, path, op, value):
+        super().__init__(path, value)
+        self.op = op
+        self.cost = self.OPS[op][1]
+
+    def to_filter(self):
+        return f"{self.path}{self.op}{quote(self.value)}" if self._pushable() else None
+
+    def match(self, obj):
+        test = self.OPS[self.op][0]
+        values = resolve(obj, self.path)
+        if self.op == "!=":
+            return all(test(v, self.value) for v in values)
+        try:
+            return any(test(v, self.value) for v in values)
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return f"{self.path}{self.op}{self.value!r}"
+
+
+class In(_FieldQuery):
+    def __init__(self, path, values):
+        super().__init__(path, list(dict.fromkeys(values)))
+        self.cost = min(1.0, 0.01 * len(self.value))
+
+    def to_filter(self):
+        if not self.value or not self._pushable():
+            return None
+        return "(" + " or ".join(f"{self.path}=={quote(v)}" for v in self.value) + ")"
+
+    def match(self, obj):
+        wanted = set(self.value)
+        return any(v in wanted for v in resolve(obj, self.path))
+
+    def __repr__(self):
+        return f"{self.path} in {self.value!r}"
+
+
+class Prefix(_FieldQuery):
+    cost = 0.1
+
+    def to_filter(self):
+        # ~ is the CSP regex match; anchor it and escape the prefix so it is matched literally
+        return f"{self.path}~{quote('^' + re.escape(self.value))}" if self._pushable() else None
+
+    def match(self, obj):
+        return any(isinstance(v, str) and v.startswith(self.value) for v in resolve(obj, self.path))
+
+    def __repr__(self):
+        return f"{self.path} startswith {self.value!r}"
+
+
+class InCidr(_FieldQuery):
+    """Address (or subnet) inside a CIDR. _filter compares strings, not addresses, so this is always local."""
+    cost = 0.2
+
+    def __init__(self, path, cidr):
+        super().__init__(path, ipaddress.ip_network(cidr, strict=False))
+
+    def _inside(self, value):
+        try:
+            net = ipaddress.ip_network(value, strict=False)
+        except ValueError:
+            return False
+        return net.version == self.value.version and net.subnet_of(self.value)
+
+    def match(self, obj):
+        return any(self._inside(v) for v in resolve(obj, self.path))
+
+    def __repr__(self):
+        return f"{self.path} in {self.value}"
+
+
+class And(Query):
+    def __init__(self, *children):
+        self.children = [c for child in children
+                         for c in (child.children if isinstance(child, And) else [child])]
+        self.cost = 1.0
+        for c in self.children:
+            self.cost *= c.cost
+
+    def to_filter(self):
+        parts = [c.to_filter() for c in self.children]
+        return None if None in parts else " and ".join(f"({p})" for p in parts)
+
+    def match(self, obj):
+        return all(c.match(obj) for c in self.children)
+
+    def fields(self):
+        return set().union(*(c.fields() for c in self.children))
+
+    def __repr__(self):
+        return " & ".join(f"({c!r})" for c in self.children)
+
+
+class Or(Query):
+    def __init__(self, *children):
+        self.children = [c for child in children
+                         for c in (child.children if isinstance(child, Or) else [child])]
+        self.cost = min(1.0, sum(c.cost for c in self.children))
+
+    def to_filter(self):
+        parts = [c.to_filter() for c in self.children]
+        return None if None in parts else "(" + " or ".join(f"({p})" for p in parts) + ")"
+
+    def match(self, obj):
+        return any(c.match(obj) for c in self.children)
+
+    def fields(self):
+        return set().union(*(c.fields() for c in self.children))
+
+    def __repr__(self):
+        return " | ".join(f"({c!r})" for c in self.children)
+
+
+class Not(Query):
+    def __init__(self, child):
+        self.child = child
+        self.cost = 1.0 - child.cost
+
+    def to_filter(self):
+        inner = self.child.to_filter()
+        return f"not ({inner})" if inner else None
+
+    def match(self, obj):
+        return not self.child.match(obj)
+
+    def fields(self):
+        return self.child.fields()
+
+    def __repr__(self):
+        return f"~({self.child!r})"
+
+
+class F:
+    """Field reference: F("tags.Site") == "Site1", F("name").startswith("prod-"),
+    F("addresses.address").in_cidr("10.20.0.0/16"), F("tags.Env").isin(["QA", "Lab"])."""
+    __hash__ = None
+
+    def __init__(self, path):
+        self.path = path
+
+    def __eq__(self, value):
+        return Cmp(self.path, "==", value)
+
+    def __ne__(self, value):
+        return Cmp(self.path, "!=", value)
+
+    def __lt__(self, value):
+        return Cmp(self.path, "<", value)
+
+    def __le__(self, value):
+        return Cmp(self.path, "<=", value)
+
+    def __gt__(self, value):
+        return Cmp(self.path, ">", value)
+
+    def __ge__(self, value):
+        return Cmp(self.path, ">=", value)
+
+    def isin(self, values):
+        return In(self.path, values)
+
+    def startswith(self, prefix):
+        return Prefix(self.path, prefix)
+
+    def in_cidr(self, cidr):
+        return InCidr(self.path, cidr)
+
+
+def all_of(*queries):
+    return queries[0] if len(queries) == 1 else And(*queries)
+
+
+# ---------------- Planner ----------------
+def plan(query, max_len=MAX_FILTER_LEN):
+    """Split a query into (_filter to send, residual Query to check locally).
+
+    Top-level AND terms the server understands are pushed down most selective
+    first while the filter stays under max_len; everything else (OR/NOT over
+    local-only terms, CIDR tests, ...) becomes the residual.
+    """
+    if query is None:
+        return None, None
+    if not isinstance(query, And):
+        text = query.to_filter()
+        return (text, None) if text and len(text) <= max_len else (None, query)
+    pushed, residual = [], []
+    for term in sorted(query.children, key=lambda q: q.cost):
+        text = term.to_filter()
+        if text and len(" and ".join(pushed + [f"({text})"])) <= max_len:
+            pushed.append(f"({text})")
+        else:
+            residual.append(term)
+    return " and ".join(pushed) or None, all_of(*residual) if residual else None
@@ -1,7 +1,7 @@
 import os
 import json
 import requests
-import time
+from credential_broker import update_env_file, ensure_sourced_from_bashrc, expiry_in_days
 
 class InfobloxSession:
     def __init__(self):
@@ -31,7 +31,8 @@ class InfobloxSession:
         self._save_to_file("jwt.txt", self.jwt)
         print(f"✅ Switched to sandbox {sandbox_id} and updated JWT")
 
-    def create_api_key_and_export_env(self, key_name="Instruqt", expiration="2025-12-10T18:44:50.121Z"):
+    def create_api_key_and_export_env(self, key_name="Instruqt", expiration=None):
+        expiration = expiration or expiry_in_days(30)
         url = f"{self.base_url}/v2/current_api_keys"
         headers = self._auth_headers()
         payload = {
@@ -49,20 +50,10 @@ class InfobloxSession:
         if not api_key:
             raise RuntimeError("❌ Failed to extract API key from response.")
 
-        # Save API key to ~/.bashrc
-        bashrc_path = os.path.expanduser("~/.bashrc")
-        export_line = f'export TF_VAR_ddi_api_key="{api_key}"\n'
-
-        with open(bashrc_path, "r") as f:
-            lines = f.readlines()
-
-        if export_line not in lines:
-            with open(bashrc_path, "a") as f:
-                f.write(f"\n# Exported by InfobloxSession on {time.ctime()}\n")
-                f.write(export_line)
-
-        os.system(f"source {bashrc_path}")
-        print("🔐 API Key stored as TF_VAR_ddi_api_key and .bashrc reloaded.")
+        # Persist in the managed env file (sourced from ~/.bashrc once)
+        update_env_file({"TF_VAR_ddi_api_key": api_key})
+        ensure_sourced_from_bashrc()
+        print("🔐 API Key stored as TF_VAR_ddi_api_key in the env file.")
 
     def _auth_headers(self):
         return {"Content-Type": "application/json", "Authorization": f"Bearer {self.jwt}"}
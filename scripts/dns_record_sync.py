@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+import json
+import argparse
+import ipaddress
+from infoblox_client import InfobloxSession, run_concurrently
+
+# Record types the sync never touches, even when pruning.
+PROTECTED_TYPES = {"SOA", "NS"}
+COMPARED_FIELDS = ("ttl", "comment", "tags")
+
+
+# ---------------- Record identity ----------------
+def _rdata_key(rdata):
+    """Canonical, hashable form of a record's rdata."""
+    norm = {}
+    for k, v in (rdata or {}).items():
+        if isinstance(v, str) and k == "address":
+            v = ipaddress.ip_address(v).compressed
+        elif isinstance(v, str) and k in ("dname", "cname", "exchange", "target"):
+            v = v.lower().rstrip(".") + "."
+        norm[k] = v
+    return json.dumps(norm, sort_keys=True)
+
+
+def record_key(rec):
+    return (rec["name_in_zone"].lower(), rec["type"].upper(), _rdata_key(rec.get("rdata")))
+
+
+def load_desired(path):
+    """Load {"zone": fqdn, "records": [...]} and index it by record identity."""
+    with open(path, "r") as f:
+        doc = json.load(f)
+    desired = {}
+    for rec in doc.get("records", []):
+        key = record_key(rec)
+        if key in desired:
+            raise ValueError(f"Duplicate record in {path}: {key[:2]}")
+        desired[key] = rec
+    return doc["zone"], desired
+
+
+def diff_records(desired, live_records, prune=False):
+    """Single pass over the live zone against the hash-indexed desired set.
+
+    Returns (creates, updates, deletes); unchanged records produce nothing.
+    Only fields present in the desired record are compared, so server-side
+    defaults never show up as drift. A live record whose rdata changed but
+    whose (name, type) matches an unclaimed desired record is PATCHed in
+    place instead of deleted and re-created. Nothing is deleted unless prune.
+    """
+    managed_types = {key[1] for key in desired}
+    wanted_names = {key[:2] for key in desired}
+    seen = set()
+    updates, leftovers = [], {}
+    for live in live_records:
+        key = record_key(live)
+        want = desired.get(key)
+        if want is None or key in seen:
+            if key[1] in managed_types and key[1] not in PROTECTED_TYPES and (prune or key[:2] in wanted_names):
+                leftovers.setdefault(key[:2], []).append(live)
+            continue
+        seen.add(key)
+        patch = {f: want[f] for f in COMPARED_FIELDS if f in want and want[f] != live.get(f)}
+        if patch:
+            updates.append((live["id"], patch))
+    creates = []
+    for key, rec in desired.items():
+        if key in seen:
+            continue
+        spare = leftovers.get(key[:2])
+        if spare:
+            live = spare.pop()
+            patch = {f: rec[f] for f in COMPARED_FIELDS if f in rec and rec[f] != live.get(f)}
+            updates.append((live["id"], dict(patch, rdata=rec["rdata"])))
+        else:
+            creates.append(rec)
+    deletes = [live for spare in leftovers.values() for live in spare] if prune else []
+    return creates, updates, deletes
+
+
+# ---------------- Sync Session ----------------
+class RecordSyncSession(InfobloxSession):
+    def stream_zone_records(self, zone_id, page_size=1000):
+        url = f"{self.base_url}/api/ddi/v1/dns/record"
+        params = {
+            "_filter": f'zone=="{zone_id}"',
+            "_fields": "id,name_in_zone,type,rdata,ttl,comment,tags",
+        }
+        return self.paginate(url, params, page_size=page_size)
+
+    def create_record(self, zone_id, rec):
+        payload = {
+            "name_in_zone": rec["name_in_zone"],
+            "zone": zone_id,
+            "type": rec["type"],
+            "rdata": rec["rdata"],
+            "options": {"create_ptr": rec.get("create_ptr", False), "check_rmz": True},
+        }
+        for f in COMPARED_FIELDS:
+            if f in rec:
+                payload[f] = rec[f]
+        if "ttl" not in rec:
+            payload["inheritance_sources"] = {"ttl": {"action": "inherit"}}
+        resp = self.request("POST", f"{self.base_url}/api/ddi/v1/dns/record", json=payload)
+        resp.raise_for_status()
+        print(f"➕ Created {rec['type']} {rec['name_in_zone']} {rec['rdata']}")
+        return resp.json()["result"]["id"]
+
+    def update_record(self, record_id, patch):
+        payload = dict(patch)
+        if "ttl" in patch:
+            payload["inheritance_sources"] = {"ttl": {"action": "override"}}
+        resp = self.request("PATCH", f"{self.base_url}/api/ddi/v1/{record_id}", json=payload)
+        resp.raise_for_status()
+        print(f"✏️ Updated {record_id}: {patch}")
+        return record_id
+
+    def delete_record(self, record_id):
+        resp = self.request("DELETE", f"{self.base_url}/api/ddi/v1/{record_id}")
+        if resp.status_code != 404:
+            resp.raise_for_status()
+        print(f"🗑️ Deleted {record_id}")
+        return record_id
+
+    def sync_zone(self, desired_path, prune=False, dry_run=False, max_workers=8):
+        zone_fqdn, desired = load_desired(desired_path)
+        zone_id = self.get_zone_id(zone_fqdn)
+
+        creates, updates, deletes = diff_records(desired, self.stream_zone_records(zone_id), prune=prune)
+        print(f"🧮 {zone_fqdn}: {len(desired)} desired | "
+              f"create={len(creates)} update={len(updates)} delete={len(deletes)}")
+        if dry_run or not (creates or updates or deletes):
+            print("ℹ️ Nothing applied." if dry_run else "✅ Zone already in sync; zero writes.")
+            return {"created": 0, "updated": 0, "deleted": 0, "failed": 0}
+
+        ops = ([("created", lambda r=r: self.create_record(zone_id, r)) for r in creates]
+               + [("updated", lambda u=u: self.update_record(*u)) for u in updates]
+               + [("deleted", lambda d=d: self.delete_record(d["id"])) for d in deletes])
+        done, errors = run_concurrently(lambda i: ops[i][1](), range(len(ops)), max_workers=max_workers)
+        for i, err in sorted(errors.items()):
+            print(f"❌ {ops[i][0][:-1]} failed: {err}")
+
+        summary = {"created": 0, "updated": 0, "deleted": 0, "failed": len(errors)}
+        for i in done:
+            summary[ops[i][0]] += 1
+        print(f"✅ Sync finished: {summary}")
+        return summary
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync a DNS zone to a desired record set.")
+    parser.add_argument("desired", help="JSON file: {\"zone\": \"infolab.com.\", \"records\": [...]}")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the diff")
+    parser.add_argument("--prune", action="store_true", help="Delete managed-type records missing from the file")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    session = RecordSyncSession()
+    session.login()
+    session.switch_account()
+    session.sync_zone(args.desired, prune=args.prune, dry_run=args.dry_run, max_workers=args.workers)
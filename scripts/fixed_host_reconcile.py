@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import argparse
+from ddi_models import Host
+from ddi_query import F
+from infoblox_client import InfobloxSession, run_concurrently
+
+# (IPAM host field, DHCP fixed address field) pairs kept in agreement
+FIELD_MAP = (("name", "hostname"), ("comment", "comment"), ("tags", "tags"))
+
+
+# ---------------- Diff ----------------
+def _label(name):
+    return (name or "").split(".")[0].lower()
+
+
+def field_patch(src, dst, source="host"):
+    """Fields of dst to change so it agrees with src; empty source values never blank the target.
+
+    Host names are compared by first label (a fixed address hostname carries
+    no domain) and tags are merged, with the source winning on conflicts.
+    """
+    patch = {}
+    for host_field, fixed_field in FIELD_MAP:
+        src_field, dst_field = (host_field, fixed_field) if source == "host" else (fixed_field, host_field)
+        want, have = src.get(src_field), dst.get(dst_field)
+        if not want:
+            continue
+        if src_field == "tags":
+            merged = dict(have or {}, **want)
+            if merged != (have or {}):
+                patch[dst_field] = merged
+        elif host_field == "name":
+            if _label(want) != _label(have):
+                patch[dst_field] = want.split(".")[0] if dst_field == "hostname" else want
+        elif want != have:
+            patch[dst_field] = want
+    return patch
+
+
+def join(fixed_addresses, hosts):
+    """(fixed address, host) pairs sharing (space, address), via a hash index over host addresses."""
+    index = {}
+    for h in hosts:
+        for a in h.get("addresses") or []:
+            index.setdefault((a.get("space"), a.get("address")), []).append(h)
+    pairs, unmatched = [], 0
+    for f in fixed_addresses:
+        partners = index.get((f.get("ip_space"), f.get("address")))
+        if not partners:
+            unmatched += 1
+            continue
+        pairs.extend((f, h) for h in partners)
+    return pairs, unmatched
+
+
+def plan_patches(pairs, source="host"):
+    """({object id: patch}, {object id: [patches]}) – targets two partners disagree on are conflicts."""
+    patches, conflicts = {}, {}
+    for fixed, host in pairs:
+        src, dst = (host, fixed) if source == "host" else (fixed, host)
+        patch = field_patch(src, dst, source)
+        if not patch:
+            continue
+        if dst["id"] in conflicts:
+            conflicts[dst["id"]].append(patch)
+        elif dst["id"] in patches and patches[dst["id"]] != patch:
+            conflicts[dst["id"]] = [patches.pop(dst["id"]), patch]
+        else:
+            patches[dst["id"]] = patch
+    return patches, conflicts
+
+
+# ---------------- Session ----------------
+class ReconcileSession(InfobloxSession):
+    def fixed_addresses(self, space_id=None):
+        return list(self.select("dhcp/fixed_address", (F("ip_space") == space_id) if space_id else None,
+                                fields=("id", "ip_space", "address", "hostname", "comment", "tags"), ttl=0))
+
+    def hosts(self):
+        return list(self.iter_models(Host, "id", "name", "addresses", "comment", "tags"))
+
+    def patch(self, object_id, payload):
+        resp = self.request("PATCH", f"{self.base_url}/api/ddi/v1/{object_id}", json=payload)
+        resp.raise_for_status()
+        print(f"✏️ {object_id}: {sorted(payload)}")
+        return object_id
+
+    def reconcile(self, source="host", space_id=None, dry_run=False, max_workers=8):
+        pulls = {"fixed": lambda: self.fixed_addresses(space_id), "hosts": self.hosts}
+        results, errors = run_concurrently(lambda k: pulls[k](), pulls, max_workers=2)
+        if errors:
+            raise RuntimeError(f"❌ Could not read {sorted(errors)}: {list(errors.values())[0]}")
+        pairs, unmatched = join(results["fixed"], results["hosts"])
+        patches, conflicts = plan_patches(pairs, source)
+
+        by_field = {}
+        for patch in patches.values():
+            for field in patch:
+                by_field[field] = by_field.get(field, 0) + 1
+        target = "fixed addresses" if source == "host" else "hosts"
+        print(f"🧮 {len(results['fixed'])} fixed address(es), {len(results['hosts'])} host(s), "
+              f"{len(pairs)} pair(s), {unmatched} fixed address(es) without a host")
+        print(f"🧮 {len(patches)} {target} to patch {by_field}, {len(conflicts)} conflict(s)")
+        for object_id, options in conflicts.items():
+            print(f"⚠️ {object_id}: partners disagree {options}; skipped")
+
+        if dry_run or not patches:
+            for object_id, patch in patches.items():
+                print(f"   {object_id}: {patch}")
+            print("ℹ️ Nothing applied." if dry_run else "✅ Already consistent; zero writes.")
+            return {"patched": 0, "failed": 0, "conflicts": len(conflicts)}
+
+        done, errors = run_concurrently(lambda oid: self.patch(oid, patches[oid]), patches, max_workers=max_workers)
+        for object_id, err in errors.items():
+            print(f"❌ {object_id}: {err}")
+        summary = {"patched": len(done), "failed": len(errors), "conflicts": len(conflicts)}
+        print(f"✅ Reconcile finished: {summary}")
+        return summary
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Align hostnames, comments and tags of fixed addresses and IPAM hosts.")
+    parser.add_argument("--source", choices=["host", "fixed"], default="host",
+                        help="Which side wins: IPAM hosts (default) or DHCP fixed addresses")
+    parser.add_argument("--space", help="Limit to one IP space id")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the planned PATCHes")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    session = ReconcileSession()
+    session.login()
+    session.switch_account()
+    session.reconcile(args.source, args.space, args.dry_run, args.workers)
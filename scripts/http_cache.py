@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_PATH = os.path.expanduser(os.getenv("INFOBLOX_HTTP_CACHE_PATH", "~/.cache/infoblox/http_cache.sqlite"))
+DEFAULT_TTL = float(os.getenv("INFOBLOX_HTTP_CACHE_TTL", "30"))
+MAX_BYTES = int(float(os.getenv("INFOBLOX_HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024)
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def enabled():
+    """INFOBLOX_HTTP_CACHE=on opts in; read per session so a process (e.g. a Lambda) can turn it off."""
+    return os.getenv("INFOBLOX_HTTP_CACHE", "").lower() in ("1", "on", "true", "yes")
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body, etag, last_modified, expires_at):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return self.expires_at > time.time()
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry ({} when the API sent none)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Persistent GET response cache shared by script runs (SQLite, LRU by last use).
+
+    Entries are keyed by account + URL + params. Responses carrying an ETag or
+    Last-Modified are revalidated once stale; others expire after max-age or
+    DEFAULT_TTL seconds and are then dropped.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES, default_ttl=DEFAULT_TTL):
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        # cached bodies hold account data: create the file owner-only (SQLite gives -wal/-shm the same mode)
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(path, 0o600)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, account TEXT, url TEXT, body BLOB, etag TEXT, last_modified TEXT,
+            expires_at REAL, last_used REAL, size INTEGER)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_used)")
+        # running size total; re-read from the table only when it says we are over budget
+        self.total = self._stored_bytes()
+
+    def _stored_bytes(self):
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def _account(account):
+        """None (not switched yet) is stored as "", since SQL `account=NULL` never matches."""
+        return account or ""
+
+    @staticmethod
+    def key(account, url, params):
+        raw = f"{HttpCache._account(account)}\0{url}\0{sorted((params or {}).items())}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT body, etag, last_modified, expires_at FROM responses WHERE key=?",
+                                  (key,)).fetchone()
+            if row is None:
+                return None
+            entry = CacheEntry(*row)
+            if not entry.fresh and not (entry.etag or entry.last_modified):
+                self.db.execute("DELETE FROM responses WHERE key=?", (key,))
+                self.total -= len(entry.body)
+                return None
+            self.db.execute("UPDATE responses SET last_used=? WHERE key=?", (time.time(), key))
+            return entry
+
+    def _ttl(self, headers):
+        control = headers.get("Cache-Control", "")
+        if "no-store" in control:
+            return None
+        m = _MAX_AGE.search(control)
+        return float(m.group(1)) if m else self.default_ttl
+
+    def put(self, key, account, url, resp):
+        ttl = self._ttl(resp.headers)
+        if ttl is None:
+            return
+        now = time.time()
+        with self.lock:
+            old = self.db.execute("SELECT size FROM responses WHERE key=?", (key,)).fetchone()
+            self.total += len(resp.content) - (old[0] if old else 0)
+            self.db.execute("INSERT OR REPLACE INTO responses VALUES (?,?,?,?,?,?,?,?,?)",
+                            (key, self._account(account), url, resp.content, resp.headers.get("ETag"),
+                             resp.headers.get("Last-Modified"), now + ttl, now, len(resp.content)))
+            self._evict()
+
+    def refresh(self, key, resp):
+        """A 304 confirmed the entry: extend its lifetime (and pick up a new ETag if one was sent)."""
+        ttl = self._ttl(resp.headers) or self.default_ttl
+        with self.lock:
+            self.db.execute("UPDATE responses SET expires_at=?, etag=COALESCE(?, etag) WHERE key=?",
+                            (time.time() + ttl, resp.headers.get("ETag"), key))
+
+    def _evict(self):
+        if self.total <= self.max_bytes:
+            return
+        # other processes share the file: resync before trimming
+        total = self.total = self._stored_bytes()
+        if total <= self.max_bytes:
+            return
+        rows = self.db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes * 0.9:
+                break
+            doomed.append((key,))
+            total -= size
+        self.db.executemany("DELETE FROM responses WHERE key=?", doomed)
+        self.total = total
+
+    def invalidate(self, account, url=None):
+        """Drop the account's entries for url and anything above or below it (all when url is None)."""
+        account = self._account(account)
+        with self.lock:
+            if url is None:
+                where, args = "account=?", (account,)
+            else:
+                where = "account=? AND (substr(url, 1, ?)=? OR substr(?, 1, length(url))=url)"
+                args = (account, len(url), url, url)
+            self.total -= self.db.execute(f"SELECT COALESCE(SUM(size), 0) FROM responses WHERE {where}",
+                                          args).fetchone()[0]
+            self.db.execute(f"DELETE FROM responses WHERE {where}", args)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import requests
+from ddi_query import F
 
 class InfobloxSession:
     def __init__(self):
@@ -81,7 +82,7 @@ class InfobloxSession:
     def list_subnets(self, block_id, limit=20):
         clean_id = block_id.split("/")[-1] if block_id.startswith("ipam/address_block/") else block_id
         url = f"{self.base_url}/api/ddi/v1/ipam/subnet"
-        params = {"_limit": str(limit), "_filter": f'parent=="ipam/address_block/{clean_id}"'}
+        params = {"_limit": str(limit), "_filter": (F("parent") == f"ipam/address_block/{clean_id}").to_filter()}
         print(f"📥 Fetching subnets under block {clean_id}...")
         resp = self.session.get(url, headers=self._auth_headers(), params=params)
         resp.raise_for_status()
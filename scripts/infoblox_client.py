@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ddi_models import Range
+from ddi_query import plan
+from http_cache import HttpCache, enabled as http_cache_enabled
+
+try:
+    from orjson import loads
+except ImportError:  # stdlib decoder; orjson is several times faster on large list pages
+    loads = json.loads
+
+
+class RateLimiter:
+    """Token bucket shared by every thread that talks to the CSP API."""
+
+    def __init__(self, rate=10.0, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce identical in-flight calls and keep their results for a short TTL.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for it and receive the same object, so only immutable
+    values (raw response bytes, ids) should go through it.
+    """
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.cache = {}
+        self.next_prune = time.monotonic() + max(ttl, 1.0)
+
+    def _prune(self, now):
+        """Drop expired results; called with the lock held, at most once per default TTL."""
+        if now < self.next_prune:
+            return
+        for key in [k for k, (expires, _) in self.cache.items() if expires <= now]:
+            del self.cache[key]
+        self.next_prune = now + max(self.ttl, 1.0)
+
+    def do(self, key, fn, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self.lock:
+            now = time.monotonic()
+            self._prune(now)
+            hit = self.cache.get(key) if ttl > 0 else None
+            if hit and hit[0] > now:
+                return hit[1]
+            if hit:
+                del self.cache[key]
+            call = self.inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self.inflight[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+                if call.error is None and ttl > 0:
+                    self.cache[key] = (time.monotonic() + ttl, call.result)
+            call.event.set()
+        return call.result
+
+    def invalidate(self, url=None):
+        """Drop cached results for url and anything above or below it (all when url is None)."""
+        with self.lock:
+            for key in list(self.cache):
+                cached_url = key[1] if len(key) > 1 else ""
+                if url is None or cached_url.startswith(url) or url.startswith(cached_url):
+                    del self.cache[key]
+
+
+class InfobloxSession:
+    def __init__(self):
+        self.base_url = "https://csp.infoblox.com"
+        self.email = os.getenv("INFOBLOX_EMAIL")
+        self.password = os.getenv("INFOBLOX_PASSWORD")
+        self.jwt = None
+        self.session = requests.Session()
+        self.headers = {"Content-Type": "application/json"}
+        self.limiter = RateLimiter(rate=float(os.getenv("INFOBLOX_RATE_LIMIT", "10")))
+        self.flight = SingleFlight(ttl=float(os.getenv("INFOBLOX_CACHE_TTL", "5")))
+        self.account_id = None
+        # persistent GET cache across runs, opt-in with INFOBLOX_HTTP_CACHE=on
+        self.http_cache = None
+        if http_cache_enabled():
+            try:
+                self.http_cache = HttpCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ HTTP cache disabled: {e}")
+
+    # ---------------- Authentication ----------------
+    def login(self):
+        payload = {"email": self.email, "password": self.password}
+        resp = self.session.post(f"{self.base_url}/v2/session/users/sign_in",
+                                 headers=self.headers, json=payload)
+        resp.raise_for_status()
+        self.jwt = resp.json()["jwt"]
+        print("✅ Logged in.")
+
+    def switch_account(self, sandbox_id=None):
+        sandbox_id = sandbox_id or self._read_file("sandbox_id.txt")
+        payload = {"id": f"identity/accounts/{sandbox_id}"}
+        resp = self.session.post(f"{self.base_url}/v2/session/account_switch",
+                                 headers=self._auth_headers(), json=payload)
+        resp.raise_for_status()
+        self.jwt = resp.json()["jwt"]
+        self.account_id = sandbox_id
+        self.flight.invalidate()
+        print(f"✅ Switched account to sandbox ID: {sandbox_id}")
+
+    # ---------------- Requests ----------------
+    def _request_with_backoff(self, method, url, max_retries=5, **kwargs):
+        """Send one rate-limited request, backing off on 429 (honours Retry-After)."""
+        headers = dict(self._auth_headers(), **kwargs.pop("headers", {}))
+        for attempt in range(max_retries):
+            self.limiter.acquire()
+            resp = self.session.request(method, url, headers=headers, **kwargs)
+            if resp.status_code != 429:
+                return resp
+            ra = resp.headers.get("Retry-After")
+            sleep_s = int(ra) if (ra and ra.isdigit()) else (2 ** attempt) + random.random()
+            print(f"⏸️  429 Too Many Requests on {method} {url}. Sleeping {sleep_s:.1f}s.")
+            time.sleep(sleep_s)
+        return resp
+
+    def request(self, method, url, **kwargs):
+        """Send one request; successful writes invalidate cached GETs of the same collection."""
+        resp = self._request_with_backoff(method, url, **kwargs)
+        if method.upper() != "GET" and resp.status_code < 400:
+            self.flight.invalidate(url.split("?")[0])
+            if self.http_cache:
+                self.http_cache.invalidate(self.account_id, url.split("?")[0])
+        return resp
+
+    def get_json(self, url, params=None, ttl=None):
+        """GET url once for all concurrent identical callers; each caller decodes its own copy."""
+        key = (self.account_id, url, tuple(sorted((params or {}).items())))
+        body = self.flight.do(key, lambda: self._cached_get(url, params, use_fresh=ttl != 0), ttl=ttl)
+        return loads(body)
+
+    def _cached_get(self, url, params, use_fresh=True):
+        """Body of a GET, served from the persistent cache when fresh, revalidated when stale.
+
+        use_fresh=False (ttl=0 callers such as readiness polls and streamed
+        pages) always asks the server and does not store new answers; an entry
+        already cached still sends its validators so an unchanged answer costs a 304.
+        """
+        if not self.http_cache:
+            resp = self._request_with_backoff("GET", url, params=params)
+            resp.raise_for_status()
+            return resp.content
+        key = self.http_cache.key(self.account_id, url, params)
+        entry = self.http_cache.get(key)
+        if entry and use_fresh and entry.fresh:
+            return entry.body
+        resp = self._request_with_backoff("GET", url, params=params,
+                                          headers=entry.validators() if entry else {})
+        if resp.status_code == 304 and entry:
+            self.http_cache.refresh(key, resp)
+            return entry.body
+        resp.raise_for_status()
+        if use_fresh:
+            self.http_cache.put(key, self.account_id, url, resp)
+        return resp.content
+
+    def paginate(self, url, params=None, page_size=1000, ttl=0):
+        """Yield every object of a list endpoint, fetching one _limit/_offset page at a time.
+
+        Identical concurrent page fetches are still coalesced, but pages are not
+        kept in the short-lived result cache unless a positive ttl is given.
+        """
+        params = dict(params or {})
+        ttl = ttl or 0
+        offset = 0
+        while True:
+            page = dict(params, _limit=str(page_size), _offset=str(offset))
+            results = self.get_json(url, page, ttl=ttl).get("results", [])
+            yield from results
+            if len(results) < page_size:
+                return
+            offset += page_size
+
+    def select(self, path, where=None, fields=None, params=None, page_size=1000, ttl=0):
+        """Yield objects of a list endpoint matching a ddi_query predicate.
+
+        The selective, server-expressible part of `where` is sent as _filter;
+        the rest is evaluated locally on each page as it streams in.
+        """
+        server, local = plan(where)
+        params = dict(params or {})
+        if server:
+            params["_filter"] = f"({params['_filter']}) and {server}" if params.get("_filter") else server
+        if fields:
+            params["_fields"] = ",".join(dict.fromkeys([*fields, *sorted(local.fields() if local else ())]))
+        for obj in self.paginate(f"{self.base_url}/api/ddi/v1/{path}", params, page_size, ttl):
+            if local is None or local.match(obj):
+                yield obj
+
+    def iter_models(self, model, *fields, where=None, params=None, page_size=1000, ttl=0):
+        """Yield `model` objects from its list endpoint, requesting only `fields` via _fields.
+
+        Pages are converted to slotted models as they arrive and are not kept in
+        the response cache by default (ttl=0), so large pulls stay compact.
+        """
+        unknown = set(fields) - set(model.FIELDS)
+        if unknown:
+            raise ValueError(f"{model.__name__} has no field(s) {sorted(unknown)}")
+        for obj in self.select(model.PATH, where, fields or model.FIELDS, params, page_size, ttl):
+            yield model.from_api(obj)
+
+    # ---------------- Lookups ----------------
+    def get_zone_id(self, fqdn):
+        url = f"{self.base_url}/api/ddi/v1/dns/auth_zone"
+        params = {"_filter": f'fqdn=="{fqdn.rstrip(".")}."', "_fields": "id,fqdn"}
+        for z in self.get_json(url, params).get("results", []):
+            if z["fqdn"].rstrip(".") == fqdn.rstrip("."):
+                print(f"🌐 Found zone {z['fqdn']} → {z['id']}")
+                return z["id"]
+        raise RuntimeError(f"❌ Zone {fqdn} not found!")
+
+    def list_ranges(self, space_id=None):
+        params = {"_filter": f'space=="{space_id}"'} if space_id else {}
+        return list(self.iter_models(Range, "id", "space", "start", "end", "comment", params=params))
+
+    def fetch_dns_view_id(self, timeout=240, initial_interval=5, max_interval=20, save=True):
+        """Poll until a DNS View is visible, then save its ID; concurrent callers share one poll loop."""
+        dns_view_id = self.flight.do((self.account_id, "fetch_dns_view_id"),
+                                     lambda: self._poll_dns_view_id(timeout, initial_interval, max_interval),
+                                     ttl=300)
+        if save:
+            self._save_to_file("dns_view_id.txt", dns_view_id)
+        return dns_view_id
+
+    def _poll_dns_view_id(self, timeout, initial_interval, max_interval):
+        url = f"{self.base_url}/api/ddi/v1/dns/view"
+        print(f"⏳ Waiting (up to {timeout}s) for DNS View to become accessible...")
+        start = time.monotonic()
+        interval = initial_interval
+        attempts = 0
+        while True:
+            try:
+                views = self.get_json(url, {"_fields": "id,name"}, ttl=0).get("results", [])
+                if views:
+                    print(f"✅ DNS View ID: {views[0]['id']}")
+                    return views[0]["id"]
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status in (403, 503):
+                    print(f"🚦 {status} transient ({e.response.reason}); retrying...")
+                else:
+                    print(f"⚠️ Fetch error: {e}; continuing...")
+            except requests.RequestException as e:
+                print(f"⚠️ Fetch error: {e}; continuing...")
+            elapsed = time.monotonic() - start
+            if elapsed > timeout:
+                raise RuntimeError("❌ Timed out waiting for DNS View to be available")
+
+            # a freshly created account often only shows its view to a new token
+            attempts += 1
+            if attempts % 3 == 0 and self.account_id:
+                try:
+                    print("🔄 Refreshing session (login + account switch)...")
+                    self.login()
+                    self.switch_account(self.account_id)
+                except Exception as e:
+                    print(f"⚠️ Session refresh failed: {e}")
+            sleep_s = min(max_interval, interval) + random.uniform(0, 0.3 * interval)
+            print(f"🕐 Still waiting... elapsed={int(elapsed)}s; next check in ~{sleep_s:.1f}s")
+            time.sleep(sleep_s)
+            interval = min(max_interval, interval * 1.7)
+
+    # ---------------- Utils ----------------
+    def _auth_headers(self):
+        return {"Content-Type": "application/json", "Authorization": f"Bearer {self.jwt}"}
+
+    def _read_file(self, filename):
+        with open(filename, "r") as f:
+            return f.read().strip()
+
+    def _save_to_file(self, filename, content):
+        with open(filename, "w") as f:
+            f.write(content)
+
+
+def run_concurrently(func, items, max_workers=8):
+    """Call func(item) for every item on a bounded thread pool.
+
+    Returns (results, errors), both dicts keyed by item, so one failed call
+    never hides the outcome of the others.
+    """
+    results, errors = {}, {}
+    items = list(items)
+    if not items:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = {pool.submit(func, item): item for item in items}
+        for fut in as_completed(futures):
+            item = futures[fut]
+            try:
+                results[item] = fut.result()
+            except Exception as e:
+                errors[item] = e
+    return results, errors
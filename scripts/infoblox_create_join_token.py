@@ -3,9 +3,7 @@
 import os
 import json
 import requests
-import time
-import subprocess
-from pathlib import Path
+from credential_broker import update_env_file, ensure_sourced_from_bashrc
 
 class InfobloxSession:
     def __init__(self):
@@ -53,31 +51,13 @@ class InfobloxSession:
         # Save to file
         self._save_to_file("join_token.txt", join_token)
 
-        # Export to env for current shell
-        os.environ["INFOBLOX_JOIN_TOKEN"] = join_token
-        os.environ["TF_VAR_infoblox_join_token"] = join_token
-        print("🌍 Exported to current session")
-
-        # Append to ~/.bashrc for persistence
-        bashrc_path = Path.home() / ".bashrc"
-        export_lines = [
-            f'export INFOBLOX_JOIN_TOKEN="{join_token}"\n',
-            f'export TF_VAR_infoblox_join_token="{join_token}"\n'
-        ]
-
-        with open(bashrc_path, "r") as f:
-            lines = f.readlines()
-
-        with open(bashrc_path, "a") as f:
-            f.write(f"\n# Exported by InfobloxSession on {time.ctime()}\n")
-            for line in export_lines:
-                if line not in lines:
-                    f.write(line)
-        print(f"💾 Appended to {bashrc_path}")
-
-        # Reload the file (non-blocking)
-        subprocess.run(["bash", "-c", f"source {bashrc_path}"], check=False)
-        print("🔁 Reloaded .bashrc to persist token")
+        # Export to env for current shell and persist in the managed env file
+        update_env_file({
+            "INFOBLOX_JOIN_TOKEN": join_token,
+            "TF_VAR_infoblox_join_token": join_token,
+        })
+        ensure_sourced_from_bashrc()
+        print("🌍 Exported to current session and env file")
 
     def _auth_headers(self):
         return {"Content-Type": "application/json", "Authorization": f"Bearer {self.jwt}"}
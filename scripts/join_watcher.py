@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import time
+import asyncio
+import argparse
+from datetime import datetime, timezone
+from credential_broker import CredentialBroker, update_env_file, env_for
+
+READY_STATUSES = {"online", "active"}
+
+
+def host_matches(host, expected):
+    """A detail_hosts entry matches on display name, IP address or OPHID."""
+    return expected in (host.get("display_name"), host.get("ip_address"), host.get("ophid"))
+
+
+def host_ready(host):
+    pool_id = (host.get("pool") or {}).get("pool_id")
+    return bool(pool_id) and host.get("composite_status") in READY_STATUSES
+
+
+# ---------------- Watcher Session ----------------
+class JoinWatcherSession(CredentialBroker):
+    def detail_hosts(self):
+        return list(self.paginate(f"{self.base_url}/api/infra/v1/detail_hosts", ttl=0))
+
+    def enable_dns_service(self, pool_id, dns_name):
+        """Same call as enable_dns_service.py, but rate-limited and retried on 429 like every other request."""
+        now = datetime.now(timezone.utc).isoformat()
+        payload = {
+            "name": dns_name,
+            "service_type": "dns",
+            "pool_id": f"infra/pool/{pool_id}",
+            "desired_state": "start",
+            "created_at": now,
+            "updated_at": now,
+            "tags": {},
+        }
+        print(f"🚀 Enabling DNS service '{dns_name}' on pool {pool_id}")
+        resp = self.request("POST", f"{self.base_url}/api/infra/v1/services", json=payload)
+        if resp.status_code == 409:
+            print(f"⚠️ DNS service '{dns_name}' already exists on pool {pool_id}")
+            return
+        resp.raise_for_status()
+        print(f"✅ DNS service '{dns_name}' enabled on pool {pool_id}")
+
+
+class JoinWatcher:
+    """Track many pending joins with one detail_hosts poll per interval.
+
+    Each pending entry maps a join token name to the host expected to join
+    with it; on_ready(token_name, host) runs as soon as that host is ready,
+    without waiting for the rest.
+    """
+
+    def __init__(self, session, on_ready, interval=10, timeout=900):
+        self.session = session
+        self.on_ready = on_ready
+        self.interval = interval
+        self.timeout = timeout
+        self.pending = {}
+
+    def add(self, token_name, expected_host):
+        self.pending[token_name] = expected_host
+
+    async def _fire(self, token_name, host):
+        try:
+            await asyncio.to_thread(self.on_ready, token_name, host)
+            return token_name, None
+        except Exception as e:
+            print(f"❌ Post-join action for {token_name} failed: {e}")
+            return token_name, e
+
+    async def run(self):
+        start = time.monotonic()
+        tasks = []
+        while self.pending:
+            try:
+                hosts = await asyncio.to_thread(self.session.detail_hosts)
+            except Exception as e:
+                print(f"⚠️ detail_hosts poll failed: {e}; retrying...")
+                hosts = []
+            for token_name, expected in list(self.pending.items()):
+                host = next((h for h in hosts if host_matches(h, expected)), None)
+                if host and host_ready(host):
+                    elapsed = time.monotonic() - start
+                    print(f"✅ {expected} joined with token {token_name} after {elapsed:.0f}s")
+                    del self.pending[token_name]
+                    tasks.append(asyncio.create_task(self._fire(token_name, host)))
+            if not self.pending:
+                break
+            if time.monotonic() - start > self.timeout:
+                print(f"❌ Timed out after {self.timeout}s waiting for: {sorted(self.pending.values())}")
+                break
+            print(f"⏳ {len(self.pending)} host(s) still joining; next poll in {self.interval}s")
+            await asyncio.sleep(self.interval)
+
+        results = dict(await asyncio.gather(*tasks))
+        return {"ready": [t for t, e in results.items() if e is None],
+                "failed": [t for t, e in results.items() if e is not None],
+                "timed_out": sorted(self.pending)}
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mint join tokens, then enable DNS on each host as soon as it joins.")
+    parser.add_argument("hosts", nargs="+", help="token_name=expected_host (display name, IP or OPHID)")
+    parser.add_argument("--interval", type=int, default=10)
+    parser.add_argument("--timeout", type=int, default=900)
+    args = parser.parse_args()
+
+    pairs = dict(h.split("=", 1) for h in args.hosts)
+
+    session = JoinWatcherSession()
+    session.login()
+    session.switch_account()
+    update_env_file(env_for(session.join_tokens(list(pairs))))
+    dns_names = {token: f"DNS-{idx}" for idx, token in enumerate(pairs, start=1)}
+
+    watcher = JoinWatcher(session,
+                          on_ready=lambda token, host: session.enable_dns_service(host["pool"]["pool_id"], dns_names[token]),
+                          interval=args.interval, timeout=args.timeout)
+    for token_name, expected in pairs.items():
+        watcher.add(token_name, expected)
+    summary = asyncio.run(watcher.run())
+    print(f"🧾 {summary}")
+    raise SystemExit(1 if summary["failed"] or summary["timed_out"] else 0)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from tfvars import load_tfvars, dump_tfvars
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "terraform"))
+STACKS = {"core": ROOT, "dns": os.path.join(ROOT, "dns")}
+PLUGIN_CACHE = os.path.expanduser(os.getenv("TF_PLUGIN_CACHE_DIR", "~/.terraform.d/plugin-cache"))
+
+
+# ---------------- Per-lab vars ----------------
+def lab_tfvars(template, lab, join_token):
+    """Copy of the lab template with names and key pairs suffixed so labs can share one account."""
+    shared = dict(template["shared_vpc"])
+    shared["name"] = f"{shared['name']}-{lab}"
+    shared["key_name"] = f"{shared['key_name']}-{lab}"
+    spokes = {}
+    for key, spoke in template["spokes"].items():
+        spoke = dict(spoke)
+        for field in ("name", "instance", "key_name"):
+            spoke[field] = f"{spoke[field]}-{lab}"
+        spokes[key] = spoke
+    tags = dict(template.get("tags") or {})
+    tags["Lab"] = lab
+    return {"shared_vpc": shared, "spokes": spokes, "infoblox_join_token": join_token, "tags": tags}
+
+
+def dns_lab_tfvars(template, lab, api_key):
+    """dns stack vars for one lab: its API key, and the template's view/zone with {lab} filled in."""
+    return {"ddi_api_key": api_key,
+            "view_name": template.get("view_name", "default").format(lab=lab),
+            "zone_fqdn": template.get("zone_fqdn", "infolab.com.").format(lab=lab),
+            **{k: v for k, v in template.items() if k not in ("ddi_api_key", "view_name", "zone_fqdn")}}
+
+
+def join_tokens_for(labs):
+    """Per-lab tokens from TF_VAR_infoblox_join_tokens (credential_broker.py), else the single token for all."""
+    tokens = json.loads(os.getenv("TF_VAR_infoblox_join_tokens", "{}"))
+    single = os.getenv("TF_VAR_infoblox_join_token", "")
+    missing = [lab for lab in labs if not tokens.get(lab) and not single]
+    if missing:
+        raise RuntimeError(f"❌ No join token for {missing}; run credential_broker.py --hosts {' '.join(missing)}")
+    return {lab: tokens.get(lab) or single for lab in labs}
+
+
+def api_keys_for(labs, dns_template):
+    """Per-lab keys from TF_VAR_ddi_api_keys, else TF_VAR_ddi_api_key for all.
+
+    Labs sharing one key write into the same account, so the dns template then
+    has to give each lab its own view or zone via a {lab} placeholder.
+    """
+    keys = json.loads(os.getenv("TF_VAR_ddi_api_keys", "{}"))
+    single = os.getenv("TF_VAR_ddi_api_key", "")
+    missing = [lab for lab in labs if not keys.get(lab) and not single]
+    if missing:
+        raise RuntimeError(f"❌ No DDI API key for {missing}; set TF_VAR_ddi_api_keys or TF_VAR_ddi_api_key")
+    shared = [lab for lab in labs if not keys.get(lab)]
+    per_lab = any("{lab}" in str(dns_template.get(k, "")) for k in ("view_name", "zone_fqdn"))
+    if len(shared) > 1 and not per_lab:
+        raise RuntimeError(f"❌ {shared} share one API key and would overwrite each other's records; "
+                           f"use a {{lab}} placeholder in view_name or zone_fqdn of the dns tfvars")
+    return {lab: keys.get(lab) or single for lab in labs}
+
+
+# ---------------- Driver ----------------
+class MultiLabDriver:
+    def __init__(self, labs, workdir="labs", max_workers=8, refresh=True, parallelism=10):
+        self.labs = labs
+        self.workdir = os.path.abspath(workdir)
+        self.max_workers = max_workers
+        self.refresh = refresh
+        self.parallelism = parallelism
+        self.timings = {lab: {} for lab in labs}
+        self._lock = threading.Lock()
+        os.makedirs(PLUGIN_CACHE, exist_ok=True)
+        self.env = dict(os.environ, TF_PLUGIN_CACHE_DIR=PLUGIN_CACHE, TF_IN_AUTOMATION="1")
+
+    def _run(self, lab, stack, step, args):
+        """Run one terraform command for one lab in its own workspace; output goes to a per-lab log."""
+        log = os.path.join(self.workdir, lab, f"{stack}-{step}.log")
+        env = dict(self.env, TF_WORKSPACE=lab)
+        start = time.perf_counter()
+        with open(log, "w") as f:
+            proc = subprocess.run(["terraform", *args], cwd=STACKS[stack], env=env,
+                                  stdout=f, stderr=subprocess.STDOUT)
+        elapsed = round(time.perf_counter() - start, 1)
+        with self._lock:
+            self.timings[lab][f"{stack}.{step}"] = elapsed
+        if proc.returncode != 0:
+            raise RuntimeError(f"{stack} {step} failed after {elapsed}s (see {log})")
+        return elapsed
+
+    def prepare(self, template, tokens, dns_template, api_keys):
+        """Write per-lab tfvars, init each stack once (providers land in the shared cache), create workspaces."""
+        for lab in self.labs:
+            os.makedirs(os.path.join(self.workdir, lab), exist_ok=True)
+            files = {"core": lab_tfvars(template, lab, tokens[lab]),
+                     "dns": dns_lab_tfvars(dns_template, lab, api_keys[lab])}
+            for stack, tfvars in files.items():
+                # the files carry a join token / API key: owner-only
+                fd = os.open(os.path.join(self.workdir, lab, f"{stack}.tfvars"),
+                             os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(dump_tfvars(tfvars))
+        for stack, path in STACKS.items():
+            print(f"📦 terraform init ({stack}) with plugin cache {PLUGIN_CACHE}")
+            subprocess.run(["terraform", "init", "-input=false"], cwd=path, env=self.env, check=True,
+                           stdout=subprocess.DEVNULL)
+            existing = subprocess.run(["terraform", "workspace", "list"], cwd=path, env=self.env,
+                                      check=True, capture_output=True, text=True).stdout
+            names = {line.strip(" *") for line in existing.splitlines()}
+            for lab in self.labs:
+                if lab not in names:
+                    subprocess.run(["terraform", "workspace", "new", lab], cwd=path, env=self.env,
+                                   check=True, stdout=subprocess.DEVNULL)
+
+    def _stack_args(self, lab, stack, action):
+        var_file = os.path.join(self.workdir, lab, f"{stack}.tfvars")
+        args = [action, "-input=false", f"-parallelism={self.parallelism}", f"-var-file={var_file}"]
+        if action == "plan":
+            args.append(f"-refresh={'true' if self.refresh else 'false'}")
+        else:
+            args.append("-auto-approve")
+        return args
+
+    def run_lab(self, lab, action):
+        # the dns stack depends on the core stack (NIOS-X must be up), and is destroyed first
+        order = ("dns", "core") if action == "destroy" else ("core", "dns")
+        for stack in order:
+            elapsed = self._run(lab, stack, action, self._stack_args(lab, stack, action))
+            print(f"✅ {lab}: {stack} {action} in {elapsed}s")
+        return lab
+
+    def run(self, action):
+        start = time.perf_counter()
+        failed = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {lab: pool.submit(self.run_lab, lab, action) for lab in self.labs}
+            for lab, fut in futures.items():
+                try:
+                    fut.result()
+                except Exception as e:
+                    print(f"❌ {lab}: {e}")
+                    failed[lab] = str(e)
+        total = round(time.perf_counter() - start, 1)
+        report = {"action": action, "labs": len(self.labs), "failed": failed,
+                  "seconds": total, "timings": self.timings}
+        with open(os.path.join(self.workdir, "timings.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"🧾 {action}: {len(self.labs) - len(failed)}/{len(self.labs)} lab(s) ok in {total}s "
+              f"(timings in {self.workdir}/timings.json)")
+        return report
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan/apply/destroy many isolated copies of the lab in parallel.")
+    parser.add_argument("action", choices=["plan", "apply", "destroy"])
+    parser.add_argument("--labs", type=int, default=1, help="Number of labs (lab01..labNN)")
+    parser.add_argument("--only", nargs="*", help="Run only these lab names")
+    parser.add_argument("--template", default=os.path.join(ROOT, "terraform.tfvars"))
+    parser.add_argument("--dns-template", default=os.path.join(STACKS["dns"], "terraform.tfvars"),
+                        help="dns stack vars; {lab} in view_name/zone_fqdn is replaced per lab")
+    parser.add_argument("--workdir", default="labs")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--parallelism", type=int, default=10, help="terraform -parallelism per lab")
+    parser.add_argument("--no-refresh", action="store_true", help="plan with -refresh=false (fast, no API reads)")
+    args = parser.parse_args()
+
+    labs = args.only or [f"lab{i:02d}" for i in range(1, args.labs + 1)]
+    driver = MultiLabDriver(labs, args.workdir, args.workers, refresh=not args.no_refresh,
+                            parallelism=args.parallelism)
+    dns_template = load_tfvars(args.dns_template)
+    driver.prepare(load_tfvars(args.template), join_tokens_for(labs), dns_template,
+                   api_keys_for(labs, dns_template))
+    report = driver.run(args.action)
+    raise SystemExit(1 if report["failed"] else 0)
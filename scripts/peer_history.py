@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+import boto3
+from boto3.dynamodb.conditions import Key
+
+# ─── CONFIG ───────────────────────────────────────────
+# One item per (peer, bucket): Events = ["<epoch>:UP", ...] plus an ExpiresAt TTL attribute
+HISTORY_TABLE_NAME = os.getenv("HISTORY_TABLE_NAME", "CloudWANPeerHistory")
+STATE_TABLE_NAME   = "CloudWANPeerState"
+BUCKET_SECONDS     = int(os.getenv("HISTORY_BUCKET_SECONDS", "3600"))
+TTL_DAYS           = int(os.getenv("HISTORY_TTL_DAYS", "35"))
+# ──────────────────────────────────────────────────────
+
+
+def bucket_key(ts):
+    """Sortable bucket name for an epoch timestamp, e.g. 2026-10-19T13:00Z for hourly buckets."""
+    start = int(ts) - int(ts) % BUCKET_SECONDS
+    return datetime.fromtimestamp(start, timezone.utc).strftime("%Y-%m-%dT%H:%MZ")
+
+
+def event_time(event):
+    """Epoch seconds of an EventBridge event (its `time` field), falling back to now."""
+    if event.get("time"):
+        return datetime.fromisoformat(event["time"].replace("Z", "+00:00")).timestamp()
+    return time.time()
+
+
+def record_transition(table, peer_arn, new_state, ts=None):
+    """Append one transition to the peer's bucket item; a single update_item, no read."""
+    ts = ts or time.time()
+    table.update_item(
+        Key={"PeerArn": peer_arn, "Bucket": bucket_key(ts)},
+        UpdateExpression="SET Events = list_append(if_not_exists(Events, :empty), :ev), ExpiresAt = :exp",
+        ExpressionAttributeValues={
+            ":empty": [],
+            ":ev": [f"{int(ts)}:{new_state}"],
+            ":exp": int(ts) + TTL_DAYS * 86400,
+        }
+    )
+
+
+def summarize(events, start, end, initial_state=None):
+    """Uptime % and flap count over [start, end) from sorted (ts, state) transitions.
+
+    Time before the first known state is excluded from the uptime denominator.
+    """
+    state, since = initial_state, start
+    up = known = 0.0
+    flaps = 0
+    for ts, new_state in events:
+        ts = min(max(ts, start), end)
+        if state is not None:
+            known += ts - since
+            up += ts - since if state == "UP" else 0
+        if state == "UP" and new_state == "DOWN":
+            flaps += 1
+        state, since = new_state, ts
+    if state is not None:
+        known += end - since
+        up += end - since if state == "UP" else 0
+    return {
+        "flaps": flaps,
+        "transitions": len(events),
+        "uptime_pct": round(100 * up / known, 2) if known else None,
+        "state": state,
+    }
+
+
+def _parse(item):
+    # sort on the timestamp only: the sort is stable, so same-second transitions keep their append order
+    return sorted(((int(ts), state) for ts, state in (e.split(":", 1) for e in item.get("Events", []))),
+                  key=lambda e: e[0])
+
+
+def _query(table, **kwargs):
+    while True:
+        resp = table.query(**kwargs)
+        yield from resp["Items"]
+        if "LastEvaluatedKey" not in resp:
+            return
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def rollup_peer(table, peer_arn, start, end):
+    """Read only the peer's buckets in the window, plus the last bucket before it for the initial state."""
+    before = table.query(
+        KeyConditionExpression=Key("PeerArn").eq(peer_arn) & Key("Bucket").lt(bucket_key(start)),
+        ScanIndexForward=False, Limit=1
+    )["Items"]
+    initial = _parse(before[0])[-1][1] if before and before[0].get("Events") else None
+
+    items = list(_query(table, KeyConditionExpression=Key("PeerArn").eq(peer_arn)
+                        & Key("Bucket").between(bucket_key(start), bucket_key(end))))
+    events = []
+    for item in items:
+        events += _parse(item)
+    # the first bucket may hold transitions from before `start`; they only set the initial state
+    events.sort(key=lambda e: e[0])
+    for ts, state in events:
+        if ts < start:
+            initial = state
+    summary = summarize([e for e in events if e[0] >= start], start, end, initial)
+    summary["buckets"] = len(items)
+    return summary
+
+
+def _peers(dynamodb):
+    table, kwargs, peers = dynamodb.Table(STATE_TABLE_NAME), {"ProjectionExpression": "PeerArn"}, []
+    while True:
+        resp = table.scan(**kwargs)
+        peers += [i["PeerArn"] for i in resp["Items"]]
+        if "LastEvaluatedKey" not in resp:
+            return sorted(peers)
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def rollup(days=7, peers=None, dynamodb=None):
+    dynamodb = dynamodb or boto3.resource("dynamodb")
+    table = dynamodb.Table(HISTORY_TABLE_NAME)
+    end = time.time()
+    start = end - days * 86400
+    report = {p: rollup_peer(table, p, start, end) for p in (peers or _peers(dynamodb))}
+    for peer, r in sorted(report.items(), key=lambda kv: -kv[1]["flaps"]):
+        print(f"📈 {peer}: flaps={r['flaps']} uptime={r['uptime_pct']}% ({r['buckets']} bucket(s))")
+    return report
+
+
+def lambda_handler(event, context):
+    """Scheduled rollup: per-peer flap counts and uptime over the last `days` (default 7)."""
+    return rollup(days=int((event or {}).get("days", 7)), peers=(event or {}).get("peers"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-peer flap counts and uptime from CloudWANPeerHistory.")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--peer", action="append", help="Peer ARN (repeatable; default: all known peers)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    result = rollup(args.days, args.peer)
+    if args.json:
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import argparse
+import tempfile
+import ipaddress
+from ddi_models import Record
+from ddi_query import F
+from infoblox_client import InfobloxSession, run_concurrently
+
+FLUSH_ROWS = 50000   # spill buffers are written out once this many rows are held
+
+
+# ---------------- Names ----------------
+def fqdn(name):
+    return name.lower().rstrip(".") + "."
+
+
+def ptr_address(owner):
+    """IPv4 address a PTR owner name stands for (RFC 2317 labels such as 0-26 are skipped), or None."""
+    labels = owner.lower().rstrip(".").split(".")
+    if labels[-2:] != ["in-addr", "arpa"]:
+        return None
+    octets = [label for label in labels[:-2] if label.isdigit()]
+    if len(octets) != 4:
+        return None
+    try:
+        return str(ipaddress.IPv4Address(".".join(reversed(octets))))
+    except ValueError:
+        return None
+
+
+def ptr_location(address, reverse_zones):
+    """(zone id, name_in_zone) of the most specific octet reverse zone holding address's PTR."""
+    octets = address.split(".")
+    for n in (3, 2, 1):
+        zone = ".".join(reversed(octets[:n])) + ".in-addr.arpa."
+        if zone in reverse_zones:
+            return reverse_zones[zone], ".".join(reversed(octets[n:]))
+    return None, None
+
+
+# ---------------- Partitioned spill ----------------
+class Spill:
+    """Rows bucketed by address prefix into JSON-lines files, so the join only holds one bucket."""
+
+    def __init__(self, directory, name, prefix):
+        self.directory = directory
+        self.name = name
+        self.shift = 32 - prefix
+        self.buffers = {}
+        self.held = 0
+        self.rows = 0
+        self.partitions = set()
+
+    def _path(self, part):
+        return os.path.join(self.directory, f"{self.name}-{part}.jsonl")
+
+    def add(self, address, row):
+        part = int(ipaddress.IPv4Address(address)) >> self.shift
+        self.buffers.setdefault(part, []).append(json.dumps(row))
+        self.partitions.add(part)
+        self.rows += 1
+        self.held += 1
+        if self.held >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        for part, lines in self.buffers.items():
+            with open(self._path(part), "a") as f:
+                f.write("\n".join(lines) + "\n")
+        self.buffers, self.held = {}, 0
+
+    def read(self, part):
+        if part not in self.partitions:
+            return
+        with open(self._path(part)) as f:
+            for line in f:
+                yield json.loads(line)
+
+
+# ---------------- Join ----------------
+def join_partition(a_rows, ptr_rows):
+    """Hash join one partition: index A records by address, then probe with every PTR.
+
+    Yields missing_ptr (A without any PTR), mismatched_ptr (PTRs exist but none
+    names an A record of that address) and orphan_ptr (PTR without an A record).
+    """
+    forward = {}
+    for row in a_rows:
+        forward.setdefault(row["address"], []).append(row)
+    seen = {}
+    for row in ptr_rows:
+        if row["address"] in forward:
+            seen.setdefault(row["address"], []).append(row)
+        else:
+            yield {"issue": "orphan_ptr", "address": row["address"], "ptr_ids": [row["id"]],
+                   "ptr_names": [row["dname"]], "a_names": []}
+    for address, a_recs in forward.items():
+        names = sorted({r["name"] for r in a_recs})
+        ptrs = seen.get(address, [])
+        if not ptrs:
+            yield {"issue": "missing_ptr", "address": address, "a_names": names, "ptr_ids": [], "ptr_names": []}
+        elif not {p["dname"] for p in ptrs} & set(names):
+            yield {"issue": "mismatched_ptr", "address": address, "a_names": names,
+                   "ptr_ids": [p["id"] for p in ptrs], "ptr_names": sorted({p["dname"] for p in ptrs})}
+
+
+# ---------------- Session ----------------
+class PtrCheckSession(InfobloxSession):
+    def stream_records(self, view_id, rtype):
+        where = (F("view") == view_id) & (F("type") == rtype)
+        return self.iter_models(Record, "id", "absolute_name_spec", "rdata", where=where)
+
+    def reverse_zones(self, view_id):
+        """{fqdn: id} of the IPv4 reverse zones in a view."""
+        url = f"{self.base_url}/api/ddi/v1/dns/auth_zone"
+        params = {"_filter": f'view=="{view_id}"', "_fields": "id,fqdn"}
+        return {fqdn(z["fqdn"]): z["id"] for z in self.paginate(url, params)
+                if fqdn(z["fqdn"]).endswith(".in-addr.arpa.")}
+
+    def spill(self, view_id, directory, prefix):
+        """Stream A and PTR records of the view concurrently into partitioned spill files."""
+        spills = {"A": Spill(directory, "a", prefix), "PTR": Spill(directory, "ptr", prefix)}
+
+        def pull(rtype):
+            spill = spills[rtype]
+            for rec in self.stream_records(view_id, rtype):
+                rdata = rec.rdata or {}
+                if rtype == "A" and rdata.get("address"):
+                    spill.add(rdata["address"], {"id": rec.id, "address": rdata["address"],
+                                                 "name": fqdn(rec.absolute_name_spec or "")})
+                elif rtype == "PTR" and rdata.get("dname"):
+                    address = ptr_address(rec.absolute_name_spec or "")
+                    if address:
+                        spill.add(address, {"id": rec.id, "address": address, "dname": fqdn(rdata["dname"])})
+            spill.flush()
+            return spill.rows
+
+        counts, errors = run_concurrently(pull, spills, max_workers=2)
+        if errors:
+            raise RuntimeError(f"❌ Could not read {sorted(errors)} records: {list(errors.values())[0]}")
+        print(f"📥 {counts['A']} A / {counts['PTR']} PTR record(s) in "
+              f"{len(spills['A'].partitions | spills['PTR'].partitions)} /{prefix} partition(s)")
+        return spills["A"], spills["PTR"]
+
+    # ---------------- Repair ----------------
+    def create_ptr(self, zone_id, name_in_zone, dname):
+        payload = {"name_in_zone": name_in_zone, "zone": zone_id, "type": "PTR", "rdata": {"dname": dname}}
+        resp = self.request("POST", f"{self.base_url}/api/ddi/v1/dns/record", json=payload)
+        resp.raise_for_status()
+        print(f"➕ PTR {name_in_zone} -> {dname}")
+
+    def update_ptr(self, record_id, dname):
+        resp = self.request("PATCH", f"{self.base_url}/api/ddi/v1/{record_id}", json={"rdata": {"dname": dname}})
+        resp.raise_for_status()
+        print(f"✏️ {record_id} -> {dname}")
+
+    def delete_record(self, record_id):
+        resp = self.request("DELETE", f"{self.base_url}/api/ddi/v1/{record_id}")
+        if resp.status_code != 404:
+            resp.raise_for_status()
+        print(f"🗑️ Deleted {record_id}")
+
+    def repair_ops(self, findings, reverse_zones, prune=False):
+        """Writes that fix the findings; anything ambiguous is left for a human."""
+        ops = []
+        for f in findings:
+            if f["issue"] == "missing_ptr":
+                zone_id, name = ptr_location(f["address"], reverse_zones)
+                if zone_id:
+                    ops.append(lambda z=zone_id, n=name, d=f["a_names"][0]: self.create_ptr(z, n, d))
+                else:
+                    print(f"⚠️ No reverse zone for {f['address']}; PTR not created")
+            elif f["issue"] == "mismatched_ptr" and len(f["ptr_ids"]) == 1 and len(f["a_names"]) == 1:
+                ops.append(lambda r=f["ptr_ids"][0], d=f["a_names"][0]: self.update_ptr(r, d))
+            elif f["issue"] == "orphan_ptr" and prune:
+                ops.append(lambda r=f["ptr_ids"][0]: self.delete_record(r))
+        return ops
+
+    def check(self, view_id, prefix=16, repair=False, prune=False, out=None, max_workers=8):
+        summary = {"missing_ptr": 0, "mismatched_ptr": 0, "orphan_ptr": 0, "repaired": 0, "failed": 0}
+        zones = self.reverse_zones(view_id) if repair else {}
+        with tempfile.TemporaryDirectory(prefix="ptr-check-") as tmp:
+            a_spill, ptr_spill = self.spill(view_id, tmp, prefix)
+            for part in sorted(a_spill.partitions | ptr_spill.partitions):
+                findings = list(join_partition(a_spill.read(part), ptr_spill.read(part)))
+                for f in findings:
+                    summary[f["issue"]] += 1
+                    if out:
+                        out.write(json.dumps(f) + "\n")
+                if repair and findings:
+                    ops = self.repair_ops(findings, zones, prune)
+                    done, errors = run_concurrently(lambda op: op(), ops, max_workers=max_workers)
+                    for err in errors.values():
+                        print(f"❌ Repair failed: {err}")
+                    summary["repaired"] += len(done)
+                    summary["failed"] += len(errors)
+        print(f"🧾 {summary}")
+        return summary
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check (and optionally repair) A/PTR consistency in a DNS view.")
+    parser.add_argument("--view", help="DNS view id (default: first view)")
+    parser.add_argument("--prefix", type=int, default=16, help="Partition the join on this address prefix")
+    parser.add_argument("--out", help="Write findings as JSON lines to this file ('-' for stdout)")
+    parser.add_argument("--repair", action="store_true", help="Create missing and fix mismatched PTRs")
+    parser.add_argument("--prune", action="store_true", help="With --repair, also delete orphan PTRs")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    session = PtrCheckSession()
+    session.login()
+    session.switch_account()
+    view_id = args.view or session.fetch_dns_view_id()
+    if args.out and args.out != "-":
+        with open(args.out, "w") as out:
+            session.check(view_id, args.prefix, args.repair, args.prune, out, args.workers)
+    else:
+        session.check(view_id, args.prefix, args.repair, args.prune, sys.stdout if args.out else None, args.workers)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+import re
+import argparse
+import threading
+import ipaddress
+from infoblox_client import InfobloxSession, run_concurrently
+
+_FREE_RUN = re.compile("0+")
+_NOT_FULL = re.compile(rb"[^\xff]")
+# 400 bodies that mean "someone else has this address" rather than a bad request
+_IN_USE = re.compile(r"already (in use|exists|allocated|reserved)|address.{0,40}(in use|conflict)|duplicate", re.I)
+
+
+def address_taken(resp):
+    """True when the server rejected a pick because the address is taken (409, or a 400 saying so)."""
+    return resp.status_code == 409 or (resp.status_code == 400 and bool(_IN_USE.search(resp.text or "")))
+
+
+# ---------------- Bitmap ----------------
+class RangeBitmap:
+    """One bit per address of an inclusive IPv4 range; a set bit means the address is taken.
+
+    Counting uses int.bit_count, next-free skips full bytes with a bytes regex
+    and free-run searches use re/str.find over a '0'/'1' view, so queries run
+    in C rather than per address in Python.
+    """
+
+    def __init__(self, start, end):
+        self.start = int(ipaddress.IPv4Address(start))
+        self.size = int(ipaddress.IPv4Address(end)) - self.start + 1
+        self.bits = bytearray((self.size + 7) // 8)
+        self._view = None
+
+    def _index(self, address):
+        i = int(ipaddress.IPv4Address(address)) - self.start
+        return i if 0 <= i < self.size else None
+
+    def __contains__(self, address):
+        return self._index(address) is not None
+
+    def mark(self, address):
+        i = self._index(address)
+        if i is not None:
+            self.bits[i >> 3] |= 1 << (i & 7)
+            self._view = None
+
+    def clear(self, address):
+        i = self._index(address)
+        if i is not None:
+            self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+            self._view = None
+
+    def is_used(self, address):
+        i = self._index(address)
+        return i is None or bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def view(self):
+        """'0'/'1' string where position i is address start+i (cached until the next change)."""
+        if self._view is None:
+            n = int.from_bytes(self.bits, "little")
+            self._view = format(n, "b").zfill(len(self.bits) * 8)[::-1][:self.size]
+        return self._view
+
+    def _addr(self, i):
+        return str(ipaddress.IPv4Address(self.start + i))
+
+    # ---------------- Queries ----------------
+    def used(self):
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def utilization(self):
+        return round(100 * self.used() / self.size, 2) if self.size else 0.0
+
+    def largest_free_run(self):
+        """(first address, length) of the longest run of free addresses, or (None, 0)."""
+        best = max(_FREE_RUN.finditer(self.view()), key=lambda m: m.end() - m.start(), default=None)
+        return (self._addr(best.start()), best.end() - best.start()) if best else (None, 0)
+
+    def next_free(self, count=1, contiguous=False):
+        """The first `count` free addresses, or the first block of `count` consecutive free ones."""
+        if contiguous:
+            i = self.view().find("0" * count)
+            return [self._addr(i + k) for k in range(count)] if i >= 0 else []
+        # skip fully used bytes in C, then look at the bits of each partly free byte
+        out = []
+        for m in _NOT_FULL.finditer(self.bits):
+            byte, base = m.group()[0], m.start() * 8
+            for bit in range(8):
+                if not byte >> bit & 1 and base + bit < self.size:
+                    out.append(self._addr(base + bit))
+                    if len(out) == count:
+                        return out
+        return out
+
+    def stats(self):
+        first, run = self.largest_free_run()
+        return {"size": self.size, "used": self.used(), "utilization_pct": self.utilization(),
+                "largest_free_run": run, "largest_free_run_start": first}
+
+
+# ---------------- Session ----------------
+class RangeBitmapSession(InfobloxSession):
+    def get_range(self, range_id):
+        range_id = range_id if range_id.startswith("ipam/range/") else f"ipam/range/{range_id}"
+        return self.get_json(f"{self.base_url}/api/ddi/v1/{range_id}", ttl=0)["result"]
+
+    def _fixed_addresses(self, space_id):
+        return [f["address"] for f in self.paginate(f"{self.base_url}/api/ddi/v1/dhcp/fixed_address",
+                                                   {"_filter": f'ip_space=="{space_id}"', "_fields": "address"},
+                                                   ttl=0)]
+
+    def _host_addresses(self, space_id):
+        return [a["address"] for h in self.paginate(f"{self.base_url}/api/ddi/v1/ipam/host",
+                                                   {"_fields": "addresses"}, ttl=0)
+                for a in h.get("addresses", []) if a.get("space") == space_id]
+
+    def _ipam_addresses(self, space_id):
+        # reserved and otherwise used addresses IPAM already tracks (network, gateway, leases, ...)
+        return [a["address"] for a in self.paginate(f"{self.base_url}/api/ddi/v1/ipam/address",
+                                                   {"_filter": f'space=="{space_id}"', "_fields": "address"},
+                                                   ttl=0)]
+
+    def build_bitmap(self, rng):
+        """Pull fixed addresses, hosts and IPAM addresses concurrently and mark those inside the range."""
+        bitmap = RangeBitmap(rng["start"], rng["end"])
+        sources = {"fixed": self._fixed_addresses, "hosts": self._host_addresses, "ipam": self._ipam_addresses}
+        results, errors = run_concurrently(lambda s: sources[s](rng["space"]), sources)
+        if errors:
+            raise RuntimeError(f"❌ Could not read {sorted(errors)}: {list(errors.values())[0]}")
+        for addresses in results.values():
+            for address in addresses:
+                if address in bitmap:
+                    bitmap.mark(address)
+        return bitmap
+
+    def create_fixed_address(self, space_id, address, mac_address):
+        """POST an explicit address; returns the response so the caller can tell conflicts apart."""
+        payload = {
+            "ip_space": space_id,
+            "address": address,
+            "match_type": "mac",
+            "match_value": mac_address,
+            "inheritance_sources": {
+                "dhcp_options": {"action": "inherit", "value": []},
+                "header_option_server_address": {"action": "inherit"},
+                "header_option_server_name": {"action": "inherit"},
+                "header_option_filename": {"action": "inherit"}
+            },
+            "dhcp_options": []
+        }
+        return self.request("POST", f"{self.base_url}/api/ddi/v1/dhcp/fixed_address", json=payload)
+
+
+class RangeAllocator:
+    """Pick free addresses locally and let the server confirm them.
+
+    Picks are marked in the bitmap under a lock, so concurrent allocations
+    never choose the same address; when the server rejects a pick because
+    someone else took it the bitmap is rebuilt and the allocation retried,
+    any other error is raised at once.
+    """
+
+    def __init__(self, session, range_id, max_retries=3):
+        self.session = session
+        self.range = session.get_range(range_id)
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.refresh()
+
+    def refresh(self):
+        bitmap = self.session.build_bitmap(self.range)
+        with self.lock:
+            # picks still waiting for the server must stay taken in the new bitmap
+            for address in self.pending:
+                bitmap.mark(address)
+            self.bitmap = bitmap
+        print(f"🗺️ {self.range['start']}-{self.range['end']}: {bitmap.stats()}")
+
+    def _pick(self):
+        with self.lock:
+            free = self.bitmap.next_free(1)
+            if not free:
+                raise RuntimeError(f"❌ Range {self.range['id']} is full")
+            self.bitmap.mark(free[0])
+            self.pending.add(free[0])
+            return free[0]
+
+    def allocate(self, mac_address):
+        for attempt in range(self.max_retries + 1):
+            address = self._pick()
+            try:
+                resp = self.session.create_fixed_address(self.range["space"], address, mac_address)
+            finally:
+                with self.lock:
+                    self.pending.discard(address)
+            if resp.status_code < 300:
+                print(f"✅ Fixed Address created: {address} for {mac_address}")
+                return address
+            if address_taken(resp) and attempt < self.max_retries:
+                print(f"⚠️ {address} already taken ({resp.status_code}); refreshing bitmap and retrying")
+                self.refresh()
+                continue
+            resp.raise_for_status()
+        raise RuntimeError(f"❌ No address confirmed for {mac_address} after {self.max_retries} retries")
+
+    def allocate_many(self, mac_addresses, max_workers=8):
+        done, errors = run_concurrently(self.allocate, mac_addresses, max_workers=max_workers)
+        for mac, err in errors.items():
+            print(f"❌ {mac}: {err}")
+        return done
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local free-space map and next-available allocation for an IP range.")
+    parser.add_argument("range_id", nargs="?", help="Range id (default: first range)")
+    parser.add_argument("--next", type=int, default=5, help="Show the next N free addresses")
+    parser.add_argument("--contiguous", action="store_true", help="--next must be one consecutive block")
+    parser.add_argument("--allocate", nargs="*", default=[], metavar="MAC", help="Create fixed addresses for MACs")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    session = RangeBitmapSession()
+    session.login()
+    session.switch_account()
+    range_id = args.range_id or session.list_ranges()[0]["id"]
+
+    if args.allocate:
+        allocator = RangeAllocator(session, range_id)
+        print(f"🧾 {allocator.allocate_many(args.allocate, max_workers=args.workers)}")
+    else:
+        bitmap = session.build_bitmap(session.get_range(range_id))
+        print(f"📊 {bitmap.stats()}")
+        print(f"✨ Next free: {bitmap.next_free(args.next, contiguous=args.contiguous)}")
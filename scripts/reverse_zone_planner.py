@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import sys
+import time
+import random
+import ipaddress
+from infoblox_client import InfobloxSession, run_concurrently
+from tfvars import load_tfvars, vpc_cidrs
+
+
+# ---------------- Planning ----------------
+def _octet_zone(network):
+    """Reverse zone name for an octet-aligned network (/8, /16 or /24)."""
+    octets = str(network.network_address).split(".")[: network.prefixlen // 8]
+    return ".".join(reversed(octets)) + ".in-addr.arpa."
+
+
+def _classless_zone(network):
+    """RFC 2317 zone name for a network longer than /24, e.g. 0-26.1.30.10.in-addr.arpa."""
+    octets = str(network.network_address).split(".")
+    return f"{octets[3]}-{network.prefixlen}." + ".".join(reversed(octets[:3])) + ".in-addr.arpa."
+
+
+def plan_reverse_zones(cidrs):
+    """Compute the minimal set of reverse zones that exactly covers the given IPv4 CIDRs.
+
+    Overlapping and adjacent CIDRs are collapsed first. Octet-aligned prefixes map
+    to a single zone, prefixes in between are split into the next octet boundary
+    (a /12 becomes sixteen /16 zones) and anything longer than /24 gets an RFC 2317
+    classless zone whose parent /24 must carry the CNAMEs.
+    """
+    networks = ipaddress.collapse_addresses(ipaddress.ip_network(c, strict=False) for c in cidrs)
+    plan = {}
+    for net in networks:
+        if net.version != 4:
+            raise ValueError(f"Only IPv4 CIDRs are supported: {net}")
+        if net.prefixlen > 24:
+            plan[_classless_zone(net)] = {
+                "fqdn": _classless_zone(net),
+                "cidr": str(net),
+                "classless": True,
+                "parent": _octet_zone(net.supernet(new_prefix=24)),
+            }
+            continue
+        boundary = max(8, -(-net.prefixlen // 8) * 8)
+        for sub in net.subnets(new_prefix=boundary):
+            plan[_octet_zone(sub)] = {"fqdn": _octet_zone(sub), "cidr": str(sub), "classless": False}
+    return sorted(plan.values(), key=lambda z: ipaddress.ip_network(z["cidr"]))
+
+
+# ---------------- Reverse Zone Session ----------------
+class ReverseZoneSession(InfobloxSession):
+    def list_zone_fqdns(self, dns_view_id, ttl=None):
+        """Return {fqdn: id} for every auth zone in a DNS view."""
+        url = f"{self.base_url}/api/ddi/v1/dns/auth_zone"
+        params = {"_filter": f'view=="{dns_view_id}"', "_fields": "id,fqdn"}
+        return {z["fqdn"].rstrip(".") + ".": z["id"] for z in self.paginate(url, params, ttl=ttl)}
+
+    def create_zone(self, dns_view_id, zone):
+        url = f"{self.base_url}/api/ddi/v1/dns/auth_zone"
+        kind = "classless reverse" if zone["classless"] else "reverse"
+        payload = {
+            "fqdn": zone["fqdn"],
+            "view": dns_view_id,
+            "primary_type": "cloud",
+            "comment": f"Auto-created {kind} zone for {zone['cidr']}"
+        }
+        resp = self.request("POST", url, json=payload)
+        if resp.status_code in (200, 201):
+            zone_id = resp.json()["result"]["id"]
+            print(f"✅ Reverse zone created: {zone['fqdn']} -> {zone_id}")
+            return zone_id
+        if resp.status_code == 409:
+            print(f"⚠️ Reverse zone {zone['fqdn']} already exists.")
+            return None
+        print(f"❌ Failed to create reverse zone {zone['fqdn']}. Status: {resp.status_code}")
+        print(resp.text)
+        resp.raise_for_status()
+
+    def wait_for_zones(self, dns_view_id, fqdns, timeout=120, initial_interval=3, max_interval=15):
+        """Poll the view's zone list until every fqdn is visible; one list call per round."""
+        pending = set(fqdns)
+        live = {}
+        start = time.monotonic()
+        interval = initial_interval
+        while pending:
+            live = self.list_zone_fqdns(dns_view_id, ttl=0)
+            pending -= live.keys()
+            if not pending:
+                break
+            elapsed = time.monotonic() - start
+            if elapsed > timeout:
+                raise RuntimeError(f"❌ Reverse zones did not propagate after {timeout}s: {sorted(pending)}")
+            sleep_s = min(max_interval, interval) + random.uniform(0, 0.3 * interval)
+            print(f"⏳ {len(pending)} reverse zone(s) still pending; next check in ~{sleep_s:.1f}s")
+            time.sleep(sleep_s)
+            interval = min(max_interval, interval * 1.7)
+        print(f"✅ All {len(fqdns)} reverse zone(s) are active.")
+        return live
+
+    def ensure_reverse_zones(self, dns_view_id, cidrs, max_workers=8, timeout=120):
+        """Plan, create the missing zones concurrently and wait for all of them at once."""
+        plan = plan_reverse_zones(cidrs)
+        existing = self.list_zone_fqdns(dns_view_id)
+        missing = [z for z in plan if z["fqdn"] not in existing]
+        print(f"🧭 {len(plan)} reverse zone(s) planned, {len(missing)} missing.")
+        for z in plan:
+            if z["classless"]:
+                print(f"ℹ️ {z['fqdn']} is classless; delegate it from {z['parent']} with CNAMEs.")
+
+        by_fqdn = {z["fqdn"]: z for z in missing}
+        _, errors = run_concurrently(lambda f: self.create_zone(dns_view_id, by_fqdn[f]),
+                                     by_fqdn, max_workers=max_workers)
+        for fqdn, err in errors.items():
+            print(f"❌ {fqdn}: {err}")
+        if errors:
+            raise RuntimeError(f"❌ {len(errors)} reverse zone(s) could not be created")
+
+        live = self.wait_for_zones(dns_view_id, list(by_fqdn), timeout=timeout) if by_fqdn else existing
+        return {z["fqdn"]: live.get(z["fqdn"], existing.get(z["fqdn"])) for z in plan}
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    tfvars_path = sys.argv[1] if len(sys.argv) > 1 else "../terraform/terraform.tfvars"
+    cidrs = vpc_cidrs(load_tfvars(tfvars_path))
+    for name, cidr in cidrs.items():
+        print(f"📦 {name}: {cidr}")
+
+    session = ReverseZoneSession()
+    session.login()
+    session.switch_account()
+
+    dns_view_id = session._read_file("dns_view_id.txt")
+    zones = session.ensure_reverse_zones(dns_view_id, cidrs.values())
+    for fqdn, zone_id in zones.items():
+        print(f"🌐 {fqdn} -> {zone_id}")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+import os
+import time
+import random
+import argparse
+from collections import Counter
+import boto3
+from moto import mock_aws
+
+REGION = "eu-west-1"
+PEER_REGIONS = ("eu-central-1", "us-east-1", "ap-southeast-2")
+ACCOUNT = "123456789012"
+
+
+# ---------------- Event streams ----------------
+def peer_arns(count):
+    """{peer arn: region}, spread round-robin over PEER_REGIONS."""
+    return {f"arn:aws:networkmanager::{ACCOUNT}:connect-peer/connect-peer-{i:06d}": PEER_REGIONS[i % len(PEER_REGIONS)]
+            for i in range(count)}
+
+
+def _event(arn, up):
+    return {"detail": {"changeType": "CONNECT_PEER_BGP_UP" if up else "CONNECT_PEER_BGP_DOWN",
+                       "connectPeerArn": arn}}
+
+
+def steady_stream(peers, events, seed=0):
+    """All peers come up, then occasional single-peer transitions."""
+    rnd = random.Random(seed)
+    stream = [_event(arn, True) for arn in peers]
+    state = dict.fromkeys(peers, True)
+    arns = list(peers)
+    for _ in range(events):
+        arn = rnd.choice(arns)
+        state[arn] = rnd.random() < 0.8
+        stream.append(_event(arn, state[arn]))
+    return stream
+
+
+def flap_stream(peers, events, seed=0, flapping=0.05):
+    """All peers come up, then a small set of peers flaps UP/DOWN back to back."""
+    rnd = random.Random(seed)
+    stream = [_event(arn, True) for arn in peers]
+    flappers = rnd.sample(list(peers), max(1, int(len(peers) * flapping)))
+    state = dict.fromkeys(flappers, True)
+    for _ in range(events):
+        arn = rnd.choice(flappers)
+        state[arn] = not state[arn]
+        stream.append(_event(arn, state[arn]))
+    return stream
+
+
+def outage_stream(peers, events, seed=0):
+    """All peers come up, every region fails one after another (route must go), one region recovers
+    (peers in random order), then `events` single-peer transitions while only a few peers are up."""
+    rnd = random.Random(seed)
+    stream = [_event(arn, True) for arn in peers]
+    for region in PEER_REGIONS:
+        stream += [_event(arn, False) for arn, r in peers.items() if r == region]
+    recovered = [arn for arn, r in peers.items() if r == PEER_REGIONS[0]]
+    rnd.shuffle(recovered)
+    stream += [_event(arn, True) for arn in recovered]
+    state = {arn: arn in recovered for arn in peers}
+    arns = list(peers)
+    for _ in range(events):
+        arn = rnd.choice(arns)
+        state[arn] = rnd.random() < 0.3   # mostly DOWN, so the last UP peer going away is exercised
+        stream.append(_event(arn, state[arn]))
+    return stream
+
+
+SCENARIOS = {"steady": steady_stream, "flap": flap_stream, "outage": outage_stream}
+
+
+def expected_states(stream):
+    """Final per-peer state implied by replaying the stream in order."""
+    return {e["detail"]["connectPeerArn"]: "UP" if e["detail"]["changeType"].endswith("_UP") else "DOWN"
+            for e in stream}
+
+
+# ---------------- Lab ----------------
+def _count_calls(client, counter):
+    client.meta.events.register("before-call.*.*", lambda model, **kw: counter.update([model.name]))
+
+
+def build_lab(monitor, mode, cidrs):
+    """Create the table, topic and route table in moto and point the monitor module at them."""
+    session = boto3.session.Session(region_name=REGION)
+    ec2 = session.client("ec2")
+    dynamodb = session.resource("dynamodb")
+    dynamodb.create_table(TableName=monitor.DDB_TABLE_NAME,
+                          KeySchema=[{"AttributeName": "PeerArn", "KeyType": "HASH"}],
+                          AttributeDefinitions=[{"AttributeName": "PeerArn", "AttributeType": "S"}],
+                          BillingMode="PAY_PER_REQUEST")
+    dynamodb.create_table(TableName="CloudWANPeerHistory",
+                          KeySchema=[{"AttributeName": "PeerArn", "KeyType": "HASH"},
+                                     {"AttributeName": "Bucket", "KeyType": "RANGE"}],
+                          AttributeDefinitions=[{"AttributeName": "PeerArn", "AttributeType": "S"},
+                                                {"AttributeName": "Bucket", "AttributeType": "S"}],
+                          BillingMode="PAY_PER_REQUEST")
+    sns = session.client("sns")
+    topic = sns.create_topic(Name="route-monitor-alerts")["TopicArn"]
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    rt_id = ec2.create_route_table(VpcId=vpc_id)["RouteTable"]["RouteTableId"]
+
+    monitor.ec2, monitor.sns = ec2, sns
+    monitor.ddb = dynamodb.Table(monitor.DDB_TABLE_NAME)
+    monitor.history = dynamodb.Table("CloudWANPeerHistory")
+    monitor.SNS_TOPIC_ARN = topic
+    monitor.VPC_RT_ID, monitor.VPC_RT_IDS = rt_id, [rt_id]
+    monitor.CIDR_BLOCK, monitor.CIDR_BLOCKS = cidrs[0], list(cidrs)
+    monitor.ROUTE_MODE = mode
+    if mode == "prefix_list":
+        monitor.PREFIX_LIST_ID = ec2.create_managed_prefix_list(
+            PrefixListName="route-monitor-bench", AddressFamily="IPv4", MaxEntries=len(cidrs)
+        )["PrefixList"]["PrefixListId"]
+
+    calls = Counter()
+    for client in (ec2, sns, monitor.ddb.meta.client):
+        _count_calls(client, calls)
+    return ec2, rt_id, calls
+
+
+def routes_correct(monitor, ec2, rt_id, any_up):
+    routes = ec2.describe_route_tables(RouteTableIds=[rt_id])["RouteTables"][0]["Routes"]
+    if monitor.ROUTE_MODE == "prefix_list":
+        referenced = any(r.get("DestinationPrefixListId") == monitor.PREFIX_LIST_ID for r in routes)
+        entries = {e["Cidr"] for e in ec2.get_managed_prefix_list_entries(
+            PrefixListId=monitor.PREFIX_LIST_ID)["Entries"]}
+        return entries == (set(monitor.CIDR_BLOCKS) if any_up else set()) and (referenced or not any_up)
+    present = any(r.get("DestinationCidrBlock") == monitor.CIDR_BLOCK for r in routes)
+    return present == any_up
+
+
+# ---------------- Replay ----------------
+def replay(scenario, peers, events, mode="route", prefixes=1, seed=0):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+    stream = SCENARIOS[scenario](peer_arns(peers), events, seed)
+    cidrs = [f"192.168.{i}.0/24" for i in range(prefixes)]
+    with mock_aws():
+        import route_monitor_lambda as monitor
+        ec2, rt_id, calls = build_lab(monitor, mode, cidrs)
+
+        latencies = []
+        start = time.perf_counter()
+        for event in stream:
+            t0 = time.perf_counter()
+            monitor.lambda_handler(event, None)
+            latencies.append(time.perf_counter() - t0)
+        total = time.perf_counter() - start
+        latencies.sort()
+
+        want = expected_states(stream)
+        stored = monitor._read_peer_states()
+        any_up = any(s == "UP" for s in want.values())
+        result = {
+            "scenario": scenario,
+            "events": len(stream),
+            "events_per_s": round(len(stream) / total, 1),
+            "calls_per_event": round(sum(calls.values()) / len(stream), 2),
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+            "p99_ms": round(latencies[int((len(latencies) - 1) * 0.99)] * 1000, 2),
+            "state_correct": stored == want,
+            "routes_correct": routes_correct(monitor, ec2, rt_id, any_up),
+            "calls": dict(calls.most_common()),
+        }
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay synthetic BGP event streams against route_monitor_lambda in moto.")
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--peers", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=2000, help="Events after the initial all-UP wave (after the outage and recovery in outage)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=["route", "prefix_list"], default="route")
+    parser.add_argument("--prefixes", type=int, default=1, help="CIDRs managed in prefix_list mode")
+    args = parser.parse_args()
+
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    print(f"\n{'scenario':<10}{'events':>8}{'ev/s':>9}{'calls/ev':>10}{'p50 ms':>9}{'p99 ms':>9}  correct")
+    for name in scenarios:
+        r = replay(name, args.peers, args.events, args.mode, args.prefixes, args.seed)
+        ok = "✅" if r["state_correct"] and r["routes_correct"] else "❌"
+        print(f"{name:<10}{r['events']:>8}{r['events_per_s']:>9}{r['calls_per_event']:>10}"
+              f"{r['p50_ms']:>9}{r['p99_ms']:>9}  {ok} {r['calls']}")
@@ -1,4 +1,5 @@
 import os
+import time
 import boto3
 from boto3.dynamodb.conditions import Key
 
@@ -8,10 +9,21 @@ CIDR_BLOCK       = "192.168.0.0/16"
 CORE_NETWORK_ID  = "core-network-0cd5a772baedb9e3f"
 SNS_TOPIC_ARN    = "arn:aws:sns:eu-west-1:905418046272:route-monitor-alerts"
 DDB_TABLE_NAME   = "CloudWANPeerState"
+HISTORY_TABLE    = os.getenv("HISTORY_TABLE_NAME", "")  # e.g. CloudWANPeerHistory; needs peer_history.py in the package
+
+# "route": one DestinationCidrBlock route for CIDR_BLOCK (default)
+# "prefix_list": keep CIDR_BLOCKS in a managed prefix list that VPC_RT_IDS reference once
+ROUTE_MODE       = os.getenv("ROUTE_MODE", "route")
+PREFIX_LIST_ID   = os.getenv("PREFIX_LIST_ID", "")
+CIDR_BLOCKS      = [c.strip() for c in os.getenv("CIDR_BLOCKS", CIDR_BLOCK).split(",") if c.strip()]
+VPC_RT_IDS       = [r.strip() for r in os.getenv("VPC_RT_IDS", VPC_RT_ID).split(",") if r.strip()]
+CORE_NETWORK_ARN = f"arn:aws:networkmanager::905418046272:core-network/{CORE_NETWORK_ID}"
+PL_BATCH_SIZE    = 100   # max entries per modify_managed_prefix_list call
 # ──────────────────────────────────────────────────────
 
 ec2 = boto3.client("ec2")
 ddb = boto3.resource("dynamodb").Table(DDB_TABLE_NAME)
+history = boto3.resource("dynamodb").Table(HISTORY_TABLE) if HISTORY_TABLE else None
 sns = boto3.client("sns")
 
 def lambda_handler(event, context):
@@ -32,11 +44,7 @@ def lambda_handler(event, context):
     new_state = "UP" if change_type == "CONNECT_PEER_BGP_UP" else "DOWN"
 
     # 1) read existing peer states
-    resp = ddb.scan(
-        ProjectionExpression="PeerArn,#S",
-        ExpressionAttributeNames={"#S": "State"}
-    )
-    items = { item["PeerArn"]: item["State"] for item in resp["Items"] }
+    items = _read_peer_states()
     old_state = items.get(peer_arn)
     print(f"{peer_arn}: {old_state} → {new_state}")
 
@@ -58,7 +66,40 @@ def lambda_handler(event, context):
     print(f"  → peers UP: {up_count}/{len(items)}")
 
     # 4) if any are UP, ensure route; if none, delete it
-    if up_count > 0:
+    _apply_routes(up_count)
+
+    # 5) flap history last: it is best effort and must never block the route change
+    if old_state != new_state:
+        _record_history(peer_arn, new_state, event)
+
+def _record_history(peer_arn, new_state, event=None):
+    """Append a transition to the optional history table; errors are logged, never raised."""
+    if not history:
+        return
+    try:
+        import peer_history   # only needed (and packaged) when history is enabled
+        ts = peer_history.event_time(event) if event else None
+        peer_history.record_transition(history, peer_arn, new_state, ts)
+    except Exception as e:
+        print(f"⚠️ history write failed for {peer_arn}: {e}")
+
+def _read_peer_states():
+    items, kwargs = {}, {}
+    while True:
+        resp = ddb.scan(
+            ProjectionExpression="PeerArn,#S",
+            ExpressionAttributeNames={"#S": "State"},
+            **kwargs
+        )
+        items.update({ item["PeerArn"]: item["State"] for item in resp["Items"] })
+        if "LastEvaluatedKey" not in resp:
+            return items
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+def _apply_routes(up_count):
+    if ROUTE_MODE == "prefix_list":
+        _sync_prefix_list(set(CIDR_BLOCKS) if up_count > 0 else set())
+    elif up_count > 0:
         _ensure_route()
     else:
         _delete_route()
@@ -102,3 +143,76 @@ def _delete_route():
                 Subject  = "❌ Delete-route error",
                 Message  = f"Error deleting {CIDR_BLOCK}: {e}"
             )
+
+
+# ─── Managed prefix list mode ─────────────────────────
+def _prefix_list_state():
+    pl = ec2.describe_managed_prefix_lists(PrefixListIds=[PREFIX_LIST_ID])["PrefixLists"][0]
+    entries = set()
+    for page in ec2.get_paginator("get_managed_prefix_list_entries").paginate(PrefixListId=PREFIX_LIST_ID):
+        entries.update(e["Cidr"] for e in page["Entries"])
+    return pl["Version"], pl["State"], pl["MaxEntries"], entries
+
+def _wait_prefix_list(timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        pl = ec2.describe_managed_prefix_lists(PrefixListIds=[PREFIX_LIST_ID])["PrefixLists"][0]
+        if pl["State"] in ("modify-complete", "create-complete"):
+            return pl["Version"]
+        if pl["State"].endswith("failed"):
+            raise RuntimeError(f"prefix list {PREFIX_LIST_ID} is {pl['State']}")
+        time.sleep(1)
+    raise TimeoutError(f"prefix list {PREFIX_LIST_ID} still modifying after {timeout}s")
+
+def _ensure_prefix_list_routes():
+    """Each route table references the prefix list once; entries change, the route does not."""
+    tables = ec2.describe_route_tables(RouteTableIds=VPC_RT_IDS)["RouteTables"]
+    for rt in tables:
+        if any(r.get("DestinationPrefixListId") == PREFIX_LIST_ID for r in rt["Routes"]):
+            continue
+        print(f"➕ adding prefix list route {PREFIX_LIST_ID} to {rt['RouteTableId']}")
+        ec2.create_route(
+            RouteTableId            = rt["RouteTableId"],
+            DestinationPrefixListId = PREFIX_LIST_ID,
+            CoreNetworkArn          = CORE_NETWORK_ARN
+        )
+
+def _sync_prefix_list(desired):
+    version, state, max_entries, current = _prefix_list_state()
+    if state not in ("modify-complete", "create-complete"):
+        version = _wait_prefix_list()
+    add, remove = sorted(desired - current), sorted(current - desired)
+    if desired:
+        _ensure_prefix_list_routes()
+    if not add and not remove:
+        print(f"✅ prefix list {PREFIX_LIST_ID} already has {len(current)} entries; skipping")
+        return
+
+    # MaxEntries counts against each referencing route table's quota, so grow only when needed
+    if len(current | desired) > max_entries:
+        print(f"📏 resizing prefix list {PREFIX_LIST_ID}: {max_entries} → {len(current | desired)}")
+        ec2.modify_managed_prefix_list(PrefixListId=PREFIX_LIST_ID, CurrentVersion=version,
+                                       MaxEntries=len(current | desired))
+        version = _wait_prefix_list()
+
+    # one versioned modify per batch of up to PL_BATCH_SIZE adds + removes
+    ops = [("add", c) for c in add] + [("remove", c) for c in remove]
+    for i in range(0, len(ops), PL_BATCH_SIZE):
+        batch = ops[i:i + PL_BATCH_SIZE]
+        print(f"✏️ prefix list {PREFIX_LIST_ID} v{version}: "
+              f"+{sum(1 for o in batch if o[0] == 'add')} -{sum(1 for o in batch if o[0] == 'remove')}")
+        kwargs = {}
+        adds = [{"Cidr": c, "Description": "route-monitor"} for op, c in batch if op == "add"]
+        removes = [{"Cidr": c} for op, c in batch if op == "remove"]
+        if adds:
+            kwargs["AddEntries"] = adds
+        if removes:
+            kwargs["RemoveEntries"] = removes
+        ec2.modify_managed_prefix_list(PrefixListId=PREFIX_LIST_ID, CurrentVersion=version, **kwargs)
+        version = _wait_prefix_list()
+
+    sns.publish(
+        TopicArn = SNS_TOPIC_ARN,
+        Subject  = "🔁 Anycast prefix list updated",
+        Message  = f"{PREFIX_LIST_ID}: added {add or 'none'}, removed {remove or 'none'}"
+    )
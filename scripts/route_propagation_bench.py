@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import os
+import random
+import argparse
+import ipaddress
+import boto3
+from moto import mock_aws
+from cloudwan_route_propagator import RoutePropagator
+
+REGIONS = ("eu-central-1", "us-east-1")
+
+
+class SyntheticPropagator(RoutePropagator):
+    """RoutePropagator whose segment routes come from memory instead of Network Manager."""
+
+    def __init__(self, segment_table, **kwargs):
+        super().__init__("core-network-local", global_network_id="global-network-local",
+                         core_network_arn="arn:aws:networkmanager::123456789012:core-network/core-network-local",
+                         verbose=False, **kwargs)
+        self.segment_table = segment_table
+
+    def segment_routes(self, segment, edge):
+        self._count()
+        return {cidr: set(ids) for cidr, ids in self.segment_table.items()}
+
+
+def build_lab(session, vpcs_per_region):
+    """Create spoke VPCs + IGWs in every region; returns (attachments, {vpc_id: igw_id})."""
+    attachments, igws = [], {}
+    n = 0
+    for region in REGIONS:
+        ec2 = session.client("ec2", region_name=region)
+        for _ in range(vpcs_per_region):
+            n += 1
+            vpc_id = ec2.create_vpc(CidrBlock=f"10.{n}.0.0/16")["Vpc"]["VpcId"]
+            igw_id = ec2.create_internet_gateway()["InternetGateway"]["InternetGatewayId"]
+            ec2.attach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
+            igws[vpc_id] = igw_id
+            attachments.append({"attachment_id": f"attachment-{n:04d}", "segment": "vpcComm",
+                                "edge": region, "region": region, "vpc_id": vpc_id})
+    return attachments, igws
+
+
+def synthetic_prefixes(count, attachments, seed=0):
+    rnd = random.Random(seed)
+    base = ipaddress.ip_network("172.16.0.0/12")
+    return {str(net): {rnd.choice(attachments)["attachment_id"]}
+            for net, _ in zip(base.subnets(new_prefix=24), range(count))}
+
+
+def run(prefixes, vpcs_per_region, churn):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        session = boto3.session.Session(region_name=REGIONS[0])
+        attachments, igws = build_lab(session, vpcs_per_region)
+        table = synthetic_prefixes(prefixes, attachments)
+        propagator = SyntheticPropagator(table, session=session, target_for=lambda vpc: {"GatewayId": igws[vpc]})
+
+        results = {"initial": propagator.reconcile(attachments),
+                   "no-op": propagator.reconcile(attachments)}
+
+        withdrawn = list(table)[: int(len(table) * churn)]
+        for cidr in withdrawn:
+            del table[cidr]
+        extra = synthetic_prefixes(prefixes + len(withdrawn), attachments, seed=1)
+        for cidr in list(extra)[prefixes:]:
+            table[cidr] = extra[cidr]
+        results["incremental"] = propagator.reconcile(attachments)
+
+    print(f"\n{'run':<12}{'created':>9}{'deleted':>9}{'api calls':>11}{'seconds':>10}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['created']:>9}{r['deleted']:>9}{r['api_calls']:>11}{r['seconds']:>10}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure route propagation reconcile time against moto.")
+    parser.add_argument("--prefixes", type=int, default=300)
+    parser.add_argument("--vpcs-per-region", type=int, default=3)
+    parser.add_argument("--churn", type=float, default=0.1, help="Fraction of prefixes replaced before the last run")
+    args = parser.parse_args()
+    run(args.prefixes, args.vpcs_per_region, args.churn)
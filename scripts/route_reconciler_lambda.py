@@ -0,0 +1,60 @@
+import os
+import boto3
+import route_monitor_lambda as monitor
+
+# ─── CONFIG ───────────────────────────────────────────
+NM_REGION = "us-west-2"   # Network Manager is a global API served from us-west-2
+# skip the pass when telemetry reports fewer than this fraction of the peers already stored
+MIN_TELEMETRY_FRACTION = float(os.getenv("MIN_TELEMETRY_FRACTION", "0.5"))
+# ──────────────────────────────────────────────────────
+
+nm = boto3.client("networkmanager", region_name=NM_REGION)
+
+def lambda_handler(event, context):
+    """Scheduled anti-entropy pass: rebuild CloudWANPeerState from Network Manager, then fix routes once."""
+    # 1) actual BGP state of every connect peer, across all core networks
+    actual = _actual_peer_states()
+
+    # 2) rebuild the table from it – unless telemetry lost most of the peers we know about
+    stored = monitor._read_peer_states()
+    if stored and (not actual or len(actual) < MIN_TELEMETRY_FRACTION * len(stored)):
+        print(f"⚠️ Telemetry returned {len(actual)} peer(s) but {len(stored)} are stored; "
+              f"skipping table rebuild and route changes")
+        return {"peers": len(actual), "stored": len(stored), "skipped": True}
+    changed = {arn: s for arn, s in actual.items() if stored.get(arn) != s}
+    stale = sorted(set(stored) - set(actual))
+    with monitor.ddb.batch_writer() as batch:
+        for arn, state in changed.items():
+            print(f"🔁 {arn}: {stored.get(arn)} → {state}")
+            batch.put_item(Item={"PeerArn": arn, "State": state})
+        for arn in stale:
+            print(f"🧹 {arn}: no longer exists, removing")
+            batch.delete_item(Key={"PeerArn": arn})
+
+    # 3) one route diff for the reconciled state
+    up_count = sum(1 for s in actual.values() if s == "UP")
+    print(f"  → peers UP: {up_count}/{len(actual)} | updated={len(changed)} removed={len(stale)}")
+    monitor._apply_routes(up_count)
+    for arn, state in changed.items():
+        monitor._record_history(arn, state)
+    return {"peers": len(actual), "up": up_count, "updated": len(changed), "removed": len(stale)}
+
+def _actual_peer_states():
+    """{connect peer ARN: "UP"/"DOWN"} from one paginated telemetry read per global network."""
+    global_networks = set()
+    for page in nm.get_paginator("list_core_networks").paginate():
+        for cn in page["CoreNetworks"]:
+            global_networks.add(cn["GlobalNetworkId"])
+
+    states = {}
+    for gn in sorted(global_networks):
+        for page in nm.get_paginator("get_network_telemetry").paginate(
+                GlobalNetworkId=gn, ResourceType="connect-peer"):
+            for t in page["NetworkTelemetry"]:
+                health = t.get("Health") or {}
+                up = health.get("Type") == "BGP" and health.get("Status") == "UP"
+                # a peer can report several health entries; any BGP UP wins
+                if up or t["ResourceArn"] not in states:
+                    states[t["ResourceArn"]] = "UP" if up else "DOWN"
+    print(f"🔎 {len(states)} connect peer(s) across {len(global_networks)} global network(s)")
+    return states
@@ -62,6 +62,16 @@ class SandboxAccountAPI:
             logger.error(f"Error fetching sandbox ID: {e}")
             return None
 
+    def find_sandbox_account_id(self, name: str) -> str:
+        """Like get_sandbox_account_id_by_name, but request errors raise, so None always means "no such sandbox"."""
+        endpoint = f"{self.base_url}/sandbox/accounts"
+        params = {"_filter": f'name=="{name}"'}
+        logger.debug(f"Querying sandbox ID with filter: {params}")
+        response = requests.get(endpoint, headers=self._headers(), params=params)
+        response.raise_for_status()
+        results = response.json().get("results") or []
+        return results[0]["id"] if results else None
+
     def delete_sandbox_account(self, sandbox_id: str) -> bool:
         endpoint = f"{self.base_url}/sandbox/accounts/{sandbox_id}"
         try:
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import subprocess
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from sandbox_api import SandboxAccountAPI
+from infoblox_client import RateLimiter, run_concurrently
+from reverse_zone_planner import ReverseZoneSession
+from credential_broker import CredentialBroker, update_env_file, env_for
+from bulk_onboard_users import OnboardingSession
+from tfvars import load_tfvars, vpc_cidrs
+
+# ─── CONFIG ───────────────────────────────────────────
+# One item per pooled sandbox, partition key Name; GSI StateIndex (State, CreatedAt), projection ALL
+POOL_TABLE_NAME     = os.getenv("POOL_TABLE_NAME", "InfobloxSandboxPool")
+STATE_INDEX         = "StateIndex"
+REFILL_LEASE        = "__refill_lease__"   # item without State (so outside the GSI) that serialises refills
+POOL_SIZE           = int(os.getenv("POOL_SIZE", "5"))
+MAX_PROVISIONING    = int(os.getenv("POOL_MAX_PROVISIONING", "3"))     # sandboxes built at once, pool-wide
+READY_MAX_AGE_HOURS = int(os.getenv("POOL_READY_MAX_AGE_HOURS", "24")) # unused sandboxes are recycled after this
+LAB_HOURS           = int(os.getenv("POOL_LAB_HOURS", "8"))            # claimed sandboxes are recycled after this
+PROVISION_TIMEOUT   = 1800
+JOIN_TOKEN_DAYS     = 7
+SANDBOX_API_URL     = "https://csp.infoblox.com/v2"
+TFVARS              = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "terraform", "terraform.tfvars")
+# ──────────────────────────────────────────────────────
+
+
+def reverse_cidrs():
+    """CIDRs that get reverse zones: POOL_REVERSE_CIDRS (comma separated) or the lab VPCs from terraform.tfvars."""
+    if os.getenv("POOL_REVERSE_CIDRS"):
+        return [c.strip() for c in os.environ["POOL_REVERSE_CIDRS"].split(",") if c.strip()]
+    return list(vpc_cidrs(load_tfvars(TFVARS)).values())
+
+
+def create_sandbox(api, name, max_retries=5):
+    """Create one sandbox account (retrying transient errors) and return (sandbox_id, external_id)."""
+    body = {
+        "name": name,
+        "description": "Pre-warmed lab sandbox (sandbox_pool.py)",
+        "state": "active",
+        "tags": {"instruqt": "igor", "pool": "true"},
+        "admin_user": {"email": os.environ.get("INFOBLOX_EMAIL"), "name": name},
+    }
+    for attempt in range(max_retries):
+        resp = api.create_sandbox_account(body)
+        if resp.get("status") == "success":
+            break
+        print(f"⚠️ {name}: attempt {attempt+1} failed: {resp.get('error')}")
+        time.sleep((2**attempt) + random.random())
+    else:
+        raise RuntimeError(f"❌ Sandbox {name} creation failed after retries")
+    result = resp["data"].get("result", resp["data"])
+    sandbox_id = (result.get("id") or "").split("/")[-1]
+    external_id = ((result.get("admin_user") or {}).get("account_id") or "").split("/")[-1]
+    if not sandbox_id or not external_id:
+        raise RuntimeError(f"❌ Sandbox/External ID not found for {name}")
+    return sandbox_id, external_id
+
+
+# ---------------- Session ----------------
+class PoolSession(ReverseZoneSession, CredentialBroker, OnboardingSession):
+    """Everything a pooled sandbox needs: DNS view, reverse zones, join token and, on claim, the user."""
+
+    def __init__(self, limiter=None):
+        super().__init__()
+        if limiter:
+            self.limiter = limiter
+
+
+# ---------------- Pool ----------------
+class SandboxPool:
+    def __init__(self, table=None, size=POOL_SIZE, max_provisioning=MAX_PROVISIONING):
+        self.table = table or boto3.resource("dynamodb").Table(POOL_TABLE_NAME)
+        self.size = size
+        self.max_provisioning = max_provisioning
+        self.api = SandboxAccountAPI(base_url=SANDBOX_API_URL, token=os.environ.get("Infoblox_Token"))
+        self.limiter = RateLimiter(rate=float(os.getenv("INFOBLOX_RATE_LIMIT", "10")))
+
+    def _by_state(self, state):
+        kwargs = {"IndexName": STATE_INDEX, "KeyConditionExpression": Key("State").eq(state)}
+        items = []
+        while True:
+            page = self.table.query(**kwargs)
+            items.extend(page["Items"])
+            if "LastEvaluatedKey" not in page:
+                return items
+            kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+    def _transition(self, name, old, new, **attrs):
+        """Move an item from state old to new (plus attrs) only if nobody moved it first."""
+        values = {":old": old, ":new": new}
+        sets = ["#s = :new"]
+        for i, (k, v) in enumerate(attrs.items()):
+            values[f":v{i}"] = v
+            sets.append(f"{k} = :v{i}")
+        try:
+            self.table.update_item(
+                Key={"Name": name},
+                UpdateExpression="SET " + ", ".join(sets),
+                ConditionExpression="#s = :old",
+                ExpressionAttributeNames={"#s": "State"},
+                ExpressionAttributeValues=values,
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    # ---------------- Provisioning ----------------
+    def provision(self, cidrs):
+        """Create and fully prepare one sandbox, then publish it as ready."""
+        name = f"pool-{uuid.uuid4().hex[:8]}"
+        now = int(time.time())
+        # the item exists before the sandbox does, so a crash mid-way still leaves something to recycle
+        self.table.put_item(Item={"Name": name, "State": "provisioning", "CreatedAt": now,
+                                  "ExpiresAt": now + PROVISION_TIMEOUT})
+        try:
+            sandbox_id, external_id = create_sandbox(self.api, name)
+            self.table.update_item(Key={"Name": name}, UpdateExpression="SET SandboxId = :s, ExternalId = :e",
+                                   ExpressionAttributeValues={":s": sandbox_id, ":e": external_id})
+            session = PoolSession(self.limiter)
+            session.login()
+            session.switch_account(sandbox_id)
+            view_id = session.fetch_dns_view_id(save=False)
+            zones = session.ensure_reverse_zones(view_id, cidrs) if cidrs else {}
+            token, _ = session._mint_join_token(name, JOIN_TOKEN_DAYS)
+        except Exception:
+            self._transition(name, "provisioning", "failed")
+            raise
+        ready_at = int(time.time())
+        if not self._transition(name, "provisioning", "ready", DnsViewId=view_id, ReverseZones=zones,
+                                JoinToken=token, ReadyAt=ready_at,
+                                ExpiresAt=ready_at + READY_MAX_AGE_HOURS * 3600):
+            raise RuntimeError(f"❌ {name} was recycled while provisioning")
+        print(f"✅ {name} ({sandbox_id}) ready in {ready_at - now}s")
+        return name
+
+    def _acquire_lease(self, owner):
+        """Take the refill lease unless another live process holds it (expires after PROVISION_TIMEOUT)."""
+        now = int(time.time())
+        try:
+            self.table.put_item(Item={"Name": REFILL_LEASE, "LeaseOwner": owner, "LeaseUntil": now + PROVISION_TIMEOUT},
+                                ConditionExpression="attribute_not_exists(#n) OR LeaseUntil < :now",
+                                ExpressionAttributeNames={"#n": "Name"}, ExpressionAttributeValues={":now": now})
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def _release_lease(self, owner):
+        try:
+            self.table.delete_item(Key={"Name": REFILL_LEASE}, ConditionExpression="LeaseOwner = :o",
+                                   ExpressionAttributeValues={":o": owner})
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+    def refill(self):
+        """Top the pool up to `size` ready/provisioning sandboxes, never building more than the cap at once.
+
+        Counting and building happen under a lease, so concurrent maintain runs
+        (one per claim, plus serve/scheduled) cannot all see the same gap and overshoot.
+        """
+        owner = uuid.uuid4().hex
+        if not self._acquire_lease(owner):
+            print("⏳ Another refill is running; skipping")
+            return {"provisioned": 0, "failed": 0}
+        try:
+            return self._refill()
+        finally:
+            self._release_lease(owner)
+
+    def _refill(self):
+        ready, building = len(self._by_state("ready")), len(self._by_state("provisioning"))
+        needed = min(self.size - ready - building, self.max_provisioning - building)
+        if needed <= 0:
+            print(f"🟢 Pool: {ready} ready, {building} provisioning (target {self.size}); nothing to do")
+            return {"provisioned": 0, "failed": 0}
+        print(f"🏗️ Pool: {ready} ready, {building} provisioning; building {needed} more")
+        cidrs = reverse_cidrs()
+        done, errors = run_concurrently(lambda i: self.provision(cidrs), range(needed),
+                                        max_workers=self.max_provisioning)
+        for err in errors.values():
+            print(f"❌ Provisioning failed: {err}")
+        return {"provisioned": len(done), "failed": len(errors)}
+
+    # ---------------- Hand-out ----------------
+    def claim(self, holder, batch=5, max_attempts=5):
+        """Atomically take the oldest unexpired ready sandbox with one conditional update.
+
+        The index is read `batch` items at a time, paging past expired ones. When every
+        candidate was taken by concurrent claims the search restarts after a short backoff.
+        """
+        for attempt in range(max_attempts):
+            now = int(time.time())
+            kwargs = {"IndexName": STATE_INDEX, "KeyConditionExpression": Key("State").eq("ready"), "Limit": batch}
+            raced = False
+            while True:
+                page = self.table.query(**kwargs)
+                for item in page["Items"]:
+                    if item["ExpiresAt"] <= now:
+                        continue
+                    raced = True
+                    if self._transition(item["Name"], "ready", "assigned", AssignedTo=holder, AssignedAt=now,
+                                        ExpiresAt=now + LAB_HOURS * 3600):
+                        print(f"🎟️ {item['Name']} ({item['SandboxId']}) assigned to {holder}")
+                        return dict(item, State="assigned", AssignedTo=holder)
+                if "LastEvaluatedKey" not in page:
+                    break
+                kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+            if not raced:
+                return None
+            # concurrent claims won every race; back off and look again
+            time.sleep((attempt + 1) * 0.2 + random.random() * 0.2)
+        return None
+
+    def release(self, name):
+        """Mark a claimed sandbox as finished so the next recycle pass deletes it."""
+        if not self._transition(name, "assigned", "assigned", ExpiresAt=int(time.time())):
+            print(f"❌ {name} is not an assigned sandbox; nothing released")
+            return False
+        print(f"👋 {name} released")
+        return True
+
+    # ---------------- Recycling ----------------
+    def _delete(self, item):
+        # ExpiresAt=now: if anything below fails, the next recycle pass retries this item
+        if not self._transition(item["Name"], item["State"], "recycling", ExpiresAt=int(time.time())):
+            return None
+        # a lookup error raises and keeps the item; only a confirmed miss means no sandbox was created
+        sandbox_id = item.get("SandboxId") or self.api.find_sandbox_account_id(item["Name"])
+        if sandbox_id and not self.api.delete_sandbox_account(sandbox_id.split("/")[-1]):
+            raise RuntimeError(f"❌ Could not delete sandbox {sandbox_id} ({item['Name']})")
+        self.table.delete_item(Key={"Name": item["Name"]})
+        print(f"♻️ {item['Name']} ({item.get('State')}) recycled")
+        return item["Name"]
+
+    def recycle(self, max_workers=4):
+        """Delete expired ready/assigned/provisioning sandboxes, failed ones and stuck recycles."""
+        now = int(time.time())
+        stale = [i for state in ("ready", "assigned", "provisioning", "recycling")
+                 for i in self._by_state(state) if i["ExpiresAt"] <= now]
+        stale += self._by_state("failed")
+        if not stale:
+            return {"recycled": 0, "failed": 0}
+        done, errors = run_concurrently(lambda i: self._delete(stale[i]), range(len(stale)), max_workers=max_workers)
+        for i, err in errors.items():
+            print(f"❌ {stale[i]['Name']}: {err}")
+        return {"recycled": sum(1 for name in done.values() if name), "failed": len(errors)}
+
+    def maintain(self):
+        summary = self.recycle()
+        summary.update(self.refill())
+        print(f"🧾 {summary}")
+        return summary
+
+
+# ---------------- Claim side ----------------
+def write_lab_files(item):
+    """The files and env the rest of the lab scripts expect, as if create_sandbox_final.py had run."""
+    for filename, value in (("sandbox_id.txt", item["SandboxId"]), ("external_id.txt", item["ExternalId"]),
+                            ("dns_view_id.txt", item["DnsViewId"])):
+        with open(filename, "w") as f:
+            f.write(value)
+    update_env_file(env_for(join_tokens={item["Name"]: item["JoinToken"]}))
+
+
+def onboard_user(item, name, email):
+    session = PoolSession()
+    session.login()
+    session.switch_account(item["SandboxId"])
+    user_id = session.create_user(name, email)
+    with open("user_id.txt", "w") as f:
+        f.write(user_id)
+    return user_id
+
+
+def refill_in_background():
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "maintain"], start_new_session=True,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def lambda_handler(event, context):
+    """Scheduled (EventBridge) recycle + refill pass."""
+    # terraform.tfvars is not packaged with the function and the home directory is read-only
+    if not os.getenv("POOL_REVERSE_CIDRS"):
+        raise RuntimeError("POOL_REVERSE_CIDRS must be set for the Lambda (comma separated lab VPC CIDRs)")
+    os.environ["INFOBLOX_HTTP_CACHE"] = "off"
+    return SandboxPool().maintain()
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep a pool of pre-provisioned lab sandboxes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    claim = sub.add_parser("claim", help="Take a ready sandbox and write sandbox_id.txt etc.")
+    claim.add_argument("--holder", default=os.getenv("INSTRUQT_PARTICIPANT_ID", "default-team"))
+    claim.add_argument("--user-email", default=os.getenv("INSTRUQT_EMAIL"), help="Also create this user")
+    claim.add_argument("--no-refill", action="store_true", help="Do not start a background refill")
+    release = sub.add_parser("release", help="Mark a claimed sandbox as finished")
+    release.add_argument("name")
+    sub.add_parser("maintain", help="One recycle + refill pass")
+    serve = sub.add_parser("serve", help="Recycle + refill forever")
+    serve.add_argument("--interval", type=int, default=60)
+    sub.add_parser("status", help="Count pooled sandboxes by state")
+    args = parser.parse_args()
+
+    pool = SandboxPool()
+    if args.command == "claim":
+        item = pool.claim(args.holder)
+        if not args.no_refill:
+            refill_in_background()
+        if not item:
+            print("❌ No ready sandbox in the pool; run create_sandbox_final.py instead")
+            sys.exit(1)
+        write_lab_files(item)
+        if args.user_email:
+            onboard_user(item, args.holder, args.user_email)
+    elif args.command == "release":
+        if not pool.release(args.name):
+            sys.exit(1)
+    elif args.command == "maintain":
+        pool.maintain()
+    elif args.command == "serve":
+        while True:
+            pool.maintain()
+            time.sleep(args.interval)
+    else:
+        for state in ("ready", "provisioning", "assigned", "recycling", "failed"):
+            print(f"📊 {state}: {len(pool._by_state(state))}")
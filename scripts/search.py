@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import requests
+from ddi_query import F, all_of, plan
 
 class InfobloxSession:
     def __init__(self):
@@ -118,14 +119,26 @@ class InfobloxSession:
         return data.get("results", [])
 
     def search_hosts_by_tags(self, filters, limit=20):
-        """filters: list of (key,value) tuples"""
-        conditions = " and ".join([f'tags.{k}=="{v}"' for k,v in filters])
+        """filters: list of (key,value) tuples, or a ddi_query predicate"""
+        query = all_of(*[F(f"tags.{k}") == v for k, v in filters]) if isinstance(filters, list) else filters
+        conditions, local = plan(query)
         url = f"{self.base_url}/api/ddi/v1/ipam/host"
-        params = {"_filter": conditions, "_limit": str(limit)}
-        print(f"🔎 Searching hosts with filter: {conditions}")
-        resp = self.session.get(url, headers=self._auth_headers(), params=params)
-        resp.raise_for_status()
-        results = resp.json().get("results", [])
+        # with a local residual a page may hold few matches, so keep paging until `limit` pass it
+        page_size = limit if local is None else max(limit, 1000)
+        params = {"_limit": str(page_size)}
+        if conditions:
+            params["_filter"] = conditions
+        print(f"🔎 Searching hosts with filter: {conditions}" + (f" (local: {local!r})" if local else ""))
+        results, offset = [], 0
+        while len(results) < limit:
+            resp = self.session.get(url, headers=self._auth_headers(), params=dict(params, _offset=str(offset)))
+            resp.raise_for_status()
+            page = resp.json().get("results", [])
+            results.extend(h for h in page if local is None or local.match(h))
+            if len(page) < page_size:
+                break
+            offset += page_size
+        results = results[:limit]
         for h in results:
             addrs = [a["address"] for a in h.get("addresses", [])]
             print(f"🖥️ Host {h['name']} → {', '.join(addrs)} | tags={h.get('tags',{})}")
@@ -192,4 +205,5 @@ if __name__ == "__main__":
     # Search examples
     session.search_hosts_by_tags([("Environment", "Production")])
     session.search_hosts_by_tags([("Environment", "Production"), ("Site", "Site1")])
+    session.search_hosts_by_tags(F("tags.Environment").isin(["Production", "QA"]) & F("name").startswith("prod-"))
     
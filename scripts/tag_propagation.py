@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import argparse
+import ipaddress
+from ddi_models import Host, Record, Zone
+from infoblox_client import InfobloxSession, run_concurrently
+
+
+def host_record_keys(host, zone_fqdns):
+    """Yield the (type, owner fqdn, address) keys of the records a host auto-generates."""
+    addresses = [ipaddress.ip_address(a["address"]) for a in host.get("addresses", []) if a.get("address")]
+    for hn in host.get("host_names", []):
+        zone_fqdn = zone_fqdns.get(hn.get("zone"))
+        if not zone_fqdn:
+            continue
+        name, zone = hn["name"].rstrip(".").lower(), zone_fqdn.rstrip(".").lower()
+        fqdn = f"{name}." if name == zone or name.endswith("." + zone) else f"{name}.{zone}."
+        for addr in addresses:
+            yield ("A" if addr.version == 4 else "AAAA", fqdn, addr.compressed)
+            yield ("PTR", addr.compressed, fqdn)
+
+
+def ptr_owner_address(owner):
+    """Address a PTR owner name stands for; RFC 2317 labels such as 0-26 are skipped."""
+    labels = owner.lower().rstrip(".").split(".")
+    try:
+        if labels[-2:] == ["in-addr", "arpa"]:
+            octets = [label for label in labels[:-2] if label.isdigit()]
+            return ipaddress.IPv4Address(".".join(reversed(octets))).compressed if len(octets) == 4 else None
+        if labels[-2:] == ["ip6", "arpa"] and len(labels) == 34:
+            nibbles = "".join(reversed(labels[:-2]))
+            return ipaddress.IPv6Address(int(nibbles, 16)).compressed
+    except ValueError:
+        return None
+    return None
+
+
+def record_key(rec, zone_fqdns):
+    """Key a live A/AAAA/PTR record the same way host_record_keys does (PTRs by the address they map)."""
+    zone_fqdn = zone_fqdns.get(rec.get("zone"))
+    if not zone_fqdn:
+        return None
+    owner = f"{rec['name_in_zone']}.{zone_fqdn}".lower() if rec.get("name_in_zone") else zone_fqdn.lower()
+    rdata = rec.get("rdata") or {}
+    if rec["type"] in ("A", "AAAA"):
+        return (rec["type"], owner, ipaddress.ip_address(rdata["address"]).compressed)
+    if rec["type"] == "PTR":
+        address = ptr_owner_address(owner)
+        return ("PTR", address, rdata.get("dname", "").rstrip(".").lower() + ".") if address else None
+    return None
+
+
+def plan_tag_patches(hosts, records, zone_fqdns):
+    """Join hosts to their generated records and return [(record_id, merged_tags)] that differ.
+
+    Records carrying an ipam_host reference are joined by that ID; the
+    (type, name, address) key is only a fallback for records without one.
+    """
+    by_id, wanted = {}, {}
+    for host in hosts:
+        tags = host.get("tags") or {}
+        if not tags:
+            continue
+        by_id[host["id"]] = tags
+        for key in host_record_keys(host, zone_fqdns):
+            wanted.setdefault(key, {}).update(tags)
+
+    patches = []
+    for rec in records:
+        if rec.get("ipam_host"):
+            tags = by_id.get(rec["ipam_host"])
+        else:
+            tags = wanted.get(record_key(rec, zone_fqdns))
+        if not tags:
+            continue
+        current = rec.get("tags") or {}
+        if all(current.get(k) == v for k, v in tags.items()):
+            continue
+        patches.append((rec["id"], {**current, **tags}))
+    return patches
+
+
+# ---------------- Tag Propagation Session ----------------
+class TagPropagationSession(InfobloxSession):
+    def zone_fqdns(self):
+        return {z.id: z.fqdn.rstrip(".") + "." for z in self.iter_models(Zone, "id", "fqdn")}
+
+    def tagged_hosts(self):
+        hosts = self.iter_models(Host, "id", "name", "addresses", "host_names", "tags")
+        return (h for h in hosts if h.tags and h.host_names)
+
+    def address_records(self):
+        params = {"_filter": 'type=="A" or type=="AAAA" or type=="PTR"'}
+        return self.iter_models(Record, "id", "zone", "name_in_zone", "type", "rdata", "ipam_host", "tags",
+                                params=params)
+
+    def patch_tags(self, record_id, tags):
+        resp = self.request("PATCH", f"{self.base_url}/api/ddi/v1/{record_id}", json={"tags": tags})
+        resp.raise_for_status()
+        print(f"🏷️  Tagged {record_id} with {tags}")
+        return record_id
+
+    def propagate(self, dry_run=False, max_workers=8):
+        zones = self.zone_fqdns()
+        hosts = list(self.tagged_hosts())
+        patches = plan_tag_patches(hosts, self.address_records(), zones)
+        print(f"🧮 {len(hosts)} tagged host(s) → {len(patches)} record(s) need tags")
+        if dry_run or not patches:
+            return {"patched": 0, "failed": 0}
+
+        by_id = dict(patches)
+        done, errors = run_concurrently(lambda rid: self.patch_tags(rid, by_id[rid]), by_id, max_workers=max_workers)
+        for rid, err in errors.items():
+            print(f"❌ {rid}: {err}")
+        summary = {"patched": len(done), "failed": len(errors)}
+        print(f"✅ Tag propagation finished: {summary}")
+        return summary
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy IPAM host tags onto the DNS records each host generated.")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    session = TagPropagationSession()
+    session.login()
+    session.switch_account()
+    session.propagate(dry_run=args.dry_run, max_workers=args.workers)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+import json
+import argparse
+import ipaddress
+import subprocess
+from infoblox_client import InfobloxSession, run_concurrently
+
+MANAGED_TAGS = {"ManagedBy": "tf_ipam_importer"}
+
+
+# ---------------- Desired state ----------------
+def _empty():
+    return {"blocks": {}, "subnets": {}, "hosts": {}}
+
+
+def desired_from_outputs(outputs):
+    """Build the desired IPAM objects from `terraform output -json` (the ipam_inventory output)."""
+    inventory = outputs["ipam_inventory"]["value"]
+    desired = _empty()
+    for vpc_name, vpc in inventory.items():
+        desired["blocks"][vpc["cidr"]] = {"comment": f"VPC {vpc_name}"}
+        for subnet in vpc.get("subnets", []):
+            desired["subnets"][subnet] = {"comment": f"{vpc_name} subnet"}
+        for host_name, ip in vpc.get("hosts", {}).items():
+            desired["hosts"][ip] = {"name": host_name, "comment": f"{vpc_name} instance"}
+    return desired
+
+
+def desired_from_state(state):
+    """Build the desired IPAM objects from a v4 terraform.tfstate (VPCs, subnets, instances, ENIs)."""
+    desired = _empty()
+    for res in state.get("resources", []):
+        if res.get("mode") != "managed":
+            continue
+        for inst in res.get("instances", []):
+            attrs = inst.get("attributes", {})
+            name = (attrs.get("tags") or {}).get("Name") or f"{res['type']}.{res['name']}"
+            if res["type"] == "aws_vpc":
+                desired["blocks"][attrs["cidr_block"]] = {"comment": f"VPC {name}"}
+            elif res["type"] == "aws_subnet":
+                desired["subnets"][attrs["cidr_block"]] = {"comment": f"{name} subnet"}
+            elif res["type"] == "aws_instance" and attrs.get("private_ip"):
+                desired["hosts"].setdefault(attrs["private_ip"], {"name": name, "comment": "EC2 instance"})
+            elif res["type"] == "aws_network_interface":
+                for ip in attrs.get("private_ips") or [attrs.get("private_ip")]:
+                    if ip:
+                        desired["hosts"].setdefault(ip, {"name": name, "comment": "Network interface"})
+    return desired
+
+
+def diff_objects(desired, existing):
+    """Return (creates, patches) where existing is {key: live object} and patches are [(id, fields)]."""
+    creates, patches = [], []
+    for key, want in desired.items():
+        live = existing.get(key)
+        if live is None:
+            creates.append((key, want))
+            continue
+        fields = {}
+        if want.get("comment") and live.get("comment") != want["comment"]:
+            fields["comment"] = want["comment"]
+        if want.get("name") and live.get("name") != want["name"]:
+            fields["name"] = want["name"]
+        tags = live.get("tags") or {}
+        if any(tags.get(k) != v for k, v in MANAGED_TAGS.items()):
+            fields["tags"] = {**tags, **MANAGED_TAGS}
+        if fields:
+            patches.append((live["id"], fields))
+    return creates, patches
+
+
+# ---------------- Importer Session ----------------
+class IpamImporterSession(InfobloxSession):
+    def space_id(self, name=None):
+        spaces = list(self.paginate(f"{self.base_url}/api/ddi/v1/ipam/ip_space", {"_fields": "id,name"}))
+        for s in spaces:
+            if name is None or s["name"] == name:
+                print(f"🌐 Using IP space {s['name']} → {s['id']}")
+                return s["id"]
+        raise RuntimeError(f"❌ IP space {name} not found!")
+
+    def existing(self, space_id):
+        fields = "id,address,cidr,comment,tags"
+        space = {"_filter": f'space=="{space_id}"'}
+        blocks = {f"{b['address']}/{b['cidr']}": b for b in self.paginate(
+            f"{self.base_url}/api/ddi/v1/ipam/address_block", dict(space, _fields=fields), ttl=0)}
+        subnets = {f"{s['address']}/{s['cidr']}": s for s in self.paginate(
+            f"{self.base_url}/api/ddi/v1/ipam/subnet", dict(space, _fields=fields), ttl=0)}
+        hosts = {}
+        for h in self.paginate(f"{self.base_url}/api/ddi/v1/ipam/host",
+                               {"_fields": "id,name,addresses,comment,tags"}, ttl=0):
+            for a in h.get("addresses", []):
+                if a.get("space") == space_id:
+                    hosts[a["address"]] = h
+        return {"blocks": blocks, "subnets": subnets, "hosts": hosts}
+
+    def _create(self, kind, space_id, key, want):
+        if kind == "hosts":
+            url = f"{self.base_url}/api/ddi/v1/ipam/host"
+            payload = {
+                "name": want["name"],
+                "addresses": [{"address": key, "space": space_id}],
+                "host_names": [],
+                "auto_generate_records": False,
+            }
+        else:
+            net = ipaddress.ip_network(key)
+            path = "address_block" if kind == "blocks" else "subnet"
+            url = f"{self.base_url}/api/ddi/v1/ipam/{path}"
+            payload = {"address": str(net.network_address), "cidr": net.prefixlen, "space": space_id}
+        payload.update(comment=want.get("comment", ""), tags=dict(MANAGED_TAGS))
+        resp = self.request("POST", url, json=payload)
+        resp.raise_for_status()
+        print(f"➕ Created {kind[:-1]} {key}")
+        return resp.json()["result"]["id"]
+
+    def _patch(self, object_id, fields):
+        resp = self.request("PATCH", f"{self.base_url}/api/ddi/v1/{object_id}", json=fields)
+        resp.raise_for_status()
+        print(f"✏️ Updated {object_id}: {sorted(fields)}")
+        return object_id
+
+    def import_desired(self, desired, space_name=None, dry_run=False, max_workers=8):
+        space_id = self.space_id(space_name)
+        existing = self.existing(space_id)
+        summary = {}
+        # Parents before children: blocks, then subnets inside them, then hosts.
+        for kind in ("blocks", "subnets", "hosts"):
+            creates, patches = diff_objects(desired[kind], existing[kind])
+            print(f"🧮 {kind}: {len(desired[kind])} desired | create={len(creates)} update={len(patches)}")
+            if dry_run:
+                continue
+            ops = ([lambda c=c: self._create(kind, space_id, *c) for c in creates]
+                   + [lambda p=p: self._patch(*p) for p in patches])
+            done, errors = run_concurrently(lambda i: ops[i](), range(len(ops)), max_workers=max_workers)
+            for err in errors.values():
+                print(f"❌ {kind}: {err}")
+            summary[kind] = {"applied": len(done), "failed": len(errors)}
+        print(f"✅ IPAM import finished: {summary}")
+        return summary
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upsert lab VPCs, subnets and host IPs from Terraform into IPAM.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--state", help="Path to a terraform.tfstate file")
+    source.add_argument("--outputs", help="Path to saved `terraform output -json`")
+    parser.add_argument("--tf-dir", default="../terraform", help="Run `terraform output -json` here (default)")
+    parser.add_argument("--space", default=None, help="IP space name (default: first space)")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.state:
+        with open(args.state) as f:
+            desired = desired_from_state(json.load(f))
+    elif args.outputs:
+        with open(args.outputs) as f:
+            desired = desired_from_outputs(json.load(f))
+    else:
+        out = subprocess.run(["terraform", "output", "-json"], cwd=args.tf_dir,
+                             check=True, capture_output=True, text=True).stdout
+        desired = desired_from_outputs(json.loads(out))
+
+    session = IpamImporterSession()
+    session.login()
+    session.switch_account()
+    session.import_desired(desired, args.space, dry_run=args.dry_run, max_workers=args.workers)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+import re
+import json
+
+_TOKEN = re.compile(r'''
+    \s+ | \#[^\n]* | //[^\n]*          # whitespace and comments
+  | (?P<str>"(?:[^"\\]|\\.)*")
+  | (?P<num>-?\d+(?:\.\d+)?)
+  | (?P<word>[A-Za-z_][\w-]*)
+  | (?P<punct>[={}\[\],:])
+''', re.VERBOSE)
+
+
+def _tokens(text):
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            raise ValueError(f"Unexpected character {text[pos]!r} at offset {pos}")
+        pos = m.end()
+        if m.lastgroup:
+            yield m.lastgroup, m.group(m.lastgroup)
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = list(_tokens(text))
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        kind, tok = self.peek()
+        if kind is None or (value is not None and tok != value):
+            raise ValueError(f"Expected {value or 'token'}, got {tok!r}")
+        self.pos += 1
+        return kind, tok
+
+    def body(self, closing=None):
+        out = {}
+        while True:
+            kind, tok = self.peek()
+            if tok == closing or kind is None:
+                return out
+            if tok == ",":
+                self.take()
+                continue
+            _, key = self.take()
+            key = key[1:-1] if kind == "str" else key
+            self.take(":" if self.peek()[1] == ":" else "=")
+            out[key] = self.value()
+
+    def value(self):
+        kind, tok = self.take()
+        if kind == "str":
+            return tok[1:-1].encode().decode("unicode_escape")
+        if kind == "num":
+            return float(tok) if "." in tok else int(tok)
+        if tok in ("true", "false"):
+            return tok == "true"
+        if tok == "null":
+            return None
+        if tok == "{":
+            out = self.body("}")
+            self.take("}")
+            return out
+        if tok == "[":
+            items = []
+            while self.peek()[1] != "]":
+                items.append(self.value())
+                if self.peek()[1] == ",":
+                    self.take()
+            self.take("]")
+            return items
+        raise ValueError(f"Unsupported value {tok!r}")
+
+
+def parse_tfvars(text):
+    """Parse the literal subset of HCL used by *.tfvars files into plain dicts/lists."""
+    return _Parser(text).body()
+
+
+def _hcl(value, indent):
+    pad = "  " * indent
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return json.dumps(value).replace("${", "$${")
+    if isinstance(value, list):
+        return "[" + ", ".join(_hcl(v, indent) for v in value) + "]"
+    if not value:
+        return "{}"
+    lines = [f"{pad}  {_key(k)} = {_hcl(v, indent + 1)}" for k, v in value.items()]
+    return "{\n" + "\n".join(lines) + f"\n{pad}}}"
+
+
+def _key(key):
+    return key if re.fullmatch(r"[A-Za-z_][\w-]*", key) else json.dumps(key)
+
+
+def dump_tfvars(tfvars):
+    """Inverse of parse_tfvars: render plain dicts/lists as a *.tfvars file."""
+    return "\n".join(f"{_key(k)} = {_hcl(v, 0)}" for k, v in tfvars.items()) + "\n"
+
+
+def load_tfvars(path):
+    with open(path, "r") as f:
+        return parse_tfvars(f.read())
+
+
+def vpc_cidrs(tfvars):
+    """Return {vpc name: cidr} for the shared VPC and every spoke in a lab tfvars dict."""
+    vpcs = {}
+    shared = tfvars.get("shared_vpc")
+    if shared:
+        vpcs[shared.get("name", "shared")] = shared["cidr"]
+    for key, spoke in (tfvars.get("spokes") or {}).items():
+        vpcs[spoke.get("name", key)] = spoke["cidr"]
+    return vpcs
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+import ipaddress
+from array import array
+from bisect import bisect_left
+from infoblox_client import InfobloxSession, run_concurrently
+
+# Snapshot layout (little-endian, every section 8-byte aligned):
+#   header | string offsets u32[n_strings + 1] | string bytes
+#   | columns zone,name,type,rdata,ttl,addr u32[n] | row hash u64[n]
+#   | name index u32[n] (sorted by name) | address index u32[n_addr] (sorted by addr)
+MAGIC = b"IBZS"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIII32s6Q")
+COLUMNS = ("zone", "name", "type", "rdata", "ttl", "addr")
+NO_ADDR = 0xFFFFFFFF
+
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % 8))
+
+
+def _ptr_address(fqdn):
+    """10.1.30.10.in-addr.arpa. -> 10.30.1.10 as int, or None for anything else."""
+    labels = fqdn.rstrip(".").split(".")
+    if len(labels) != 6 or labels[-2:] != ["in-addr", "arpa"]:
+        return None
+    try:
+        return int(ipaddress.IPv4Address(".".join(reversed(labels[:4]))))
+    except ValueError:
+        return None
+
+
+def _row_hash(zone, name, rtype, rdata, ttl):
+    h = hashlib.blake2b(f"{zone}\0{name}\0{rtype}\0{rdata}\0{ttl}".encode(), digest_size=8)
+    return int.from_bytes(h.digest(), "little")
+
+
+# ---------------- Writer ----------------
+class SnapshotWriter:
+    def __init__(self):
+        self.strings = {}
+        self.columns = {c: array("I") for c in COLUMNS}
+        self.hashes = array("Q")
+
+    def _sid(self, s):
+        sid = self.strings.get(s)
+        if sid is None:
+            sid = self.strings[s] = len(self.strings)
+        return sid
+
+    def add(self, zone, name, rtype, rdata, ttl=0, addr=None):
+        name = name.lower()
+        for col, value in zip(COLUMNS[:4], (zone, name, rtype, rdata)):
+            self.columns[col].append(self._sid(value))
+        self.columns["ttl"].append(ttl or 0)
+        self.columns["addr"].append(NO_ADDR if addr is None else addr)
+        self.hashes.append(_row_hash(zone, name, rtype, rdata, ttl or 0))
+
+    def add_record(self, zone_fqdn, rec):
+        name_in_zone = rec.get("name_in_zone") or ""
+        name = f"{name_in_zone}.{zone_fqdn}" if name_in_zone else zone_fqdn
+        rdata = rec.get("dns_rdata") or json.dumps(rec.get("rdata", {}), sort_keys=True)
+        addr = None
+        if rec["type"] == "A":
+            addr = int(ipaddress.IPv4Address(rec["rdata"]["address"]))
+        elif rec["type"] == "PTR":
+            addr = _ptr_address(name)
+        self.add(zone_fqdn, name, rec["type"], rdata, rec.get("ttl"), addr)
+
+    def write(self, path):
+        if sys.byteorder != "little":
+            raise RuntimeError("Snapshots are written in little-endian layout only")
+        n = len(self.hashes)
+        names = [s.encode() for s in self.strings]
+        offsets = array("I", [0])
+        for b in names:
+            offsets.append(offsets[-1] + len(b))
+
+        name_col, addr_col = self.columns["name"], self.columns["addr"]
+        name_idx = array("I", sorted(range(n), key=lambda i: names[name_col[i]]))
+        addr_idx = array("I", sorted((i for i in range(n) if addr_col[i] != NO_ADDR), key=addr_col.__getitem__))
+        digest = hashlib.sha256(array("Q", sorted(self.hashes)).tobytes()).digest()
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            pos = {}
+            for section, data in (("str_offsets", offsets), ("str_data", b"".join(names)),
+                                  ("columns", [self.columns[c] for c in COLUMNS]),
+                                  ("hashes", self.hashes), ("name_idx", name_idx), ("addr_idx", addr_idx)):
+                _pad(f)
+                pos[section] = f.tell()
+                for chunk in (data if isinstance(data, list) else [data]):
+                    f.write(chunk)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, n, len(names), len(addr_idx), digest,
+                                pos["str_offsets"], pos["str_data"], pos["columns"],
+                                pos["hashes"], pos["name_idx"], pos["addr_idx"]))
+        os.replace(tmp, path)
+        print(f"💾 Snapshot written: {path} ({n} records, {len(names)} strings, {os.path.getsize(path)} bytes)")
+        return digest.hex()
+
+
+# ---------------- Reader ----------------
+class ZoneSnapshot:
+    """Memory-mapped, read-only view of a snapshot file; nothing is decoded until asked for."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count, n_strings, n_addr, self.digest,
+         str_off, str_data, cols, hashes, name_idx, addr_idx) = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a v{VERSION} zone snapshot")
+        view = memoryview(self._mm)
+        n = self.count
+        self._str_off = view[str_off:str_off + 4 * (n_strings + 1)].cast("I")
+        self._str_data = str_data
+        self._cols = {c: view[cols + 4 * n * k:cols + 4 * n * (k + 1)].cast("I") for k, c in enumerate(COLUMNS)}
+        self.hashes = view[hashes:hashes + 8 * n].cast("Q")
+        self._name_idx = view[name_idx:name_idx + 4 * n].cast("I")
+        self._addr_idx = view[addr_idx:addr_idx + 4 * n_addr].cast("I")
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for mv in (self._str_off, *self._cols.values(), self.hashes, self._name_idx, self._addr_idx):
+            mv.release()
+        self._mm.close()
+        self._file.close()
+
+    def _bytes(self, sid):
+        return self._mm[self._str_data + self._str_off[sid]:self._str_data + self._str_off[sid + 1]]
+
+    def record(self, i):
+        rec = {c: self._bytes(self._cols[c][i]).decode() for c in COLUMNS[:4]}
+        rec["ttl"] = self._cols["ttl"][i]
+        addr = self._cols["addr"][i]
+        rec["addr"] = None if addr == NO_ADDR else str(ipaddress.IPv4Address(addr))
+        return rec
+
+    def lookup_name(self, fqdn):
+        key = (fqdn.rstrip(".") + ".").lower().encode()
+        names = _KeyView(self._name_idx, lambda i: self._bytes(self._cols["name"][i]))
+        out = []
+        for pos in range(bisect_left(names, key), len(names)):
+            if names[pos] != key:
+                break
+            out.append(self.record(self._name_idx[pos]))
+        return out
+
+    def lookup_address(self, ip):
+        key = int(ipaddress.IPv4Address(ip))
+        addrs = _KeyView(self._addr_idx, self._cols["addr"].__getitem__)
+        out = []
+        for pos in range(bisect_left(addrs, key), len(addrs)):
+            if addrs[pos] != key:
+                break
+            out.append(self.record(self._addr_idx[pos]))
+        return out
+
+
+class _KeyView:
+    """Sequence adapter so bisect can search an index column by the key it points at."""
+
+    def __init__(self, index, key):
+        self.index, self.key = index, key
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, pos):
+        return self.key(self.index[pos])
+
+
+def diff_snapshots(old, new):
+    """Return (removed, added) records; identical digests short-circuit without touching rows."""
+    if old.digest == new.digest:
+        return [], []
+    old_h, new_h = set(old.hashes), set(new.hashes)
+    removed = [old.record(i) for i, h in enumerate(old.hashes) if h not in new_h]
+    added = [new.record(i) for i, h in enumerate(new.hashes) if h not in old_h]
+    return removed, added
+
+
+# ---------------- Export Session ----------------
+class SnapshotSession(InfobloxSession):
+    def fetch_zone_records(self, zone_fqdn, page_size=1000):
+        zone_id = self.get_zone_id(zone_fqdn)
+        url = f"{self.base_url}/api/ddi/v1/dns/record"
+        params = {"_filter": f'zone=="{zone_id}"', "_fields": "name_in_zone,type,rdata,dns_rdata,ttl"}
+        records = list(self.paginate(url, params, page_size=page_size))
+        print(f"📥 {zone_fqdn}: {len(records)} record(s)")
+        return records
+
+    def export(self, zone_fqdns, path, max_workers=4):
+        zone_fqdns = [z.rstrip(".") + "." for z in zone_fqdns]
+        results, errors = run_concurrently(self.fetch_zone_records, zone_fqdns, max_workers=max_workers)
+        for zone, err in errors.items():
+            print(f"❌ {zone}: {err}")
+        if errors:
+            raise RuntimeError(f"❌ Export failed for {len(errors)} zone(s)")
+        writer = SnapshotWriter()
+        for zone in zone_fqdns:
+            for rec in results[zone]:
+                writer.add_record(zone, rec)
+        return writer.write(path)
+
+
+# ---------------- Main ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export, query and diff DNS zone snapshots.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_export = sub.add_parser("export")
+    p_export.add_argument("path")
+    p_export.add_argument("zones", nargs="+")
+    p_lookup = sub.add_parser("lookup")
+    p_lookup.add_argument("path")
+    p_lookup.add_argument("key", help="FQDN or IPv4 address")
+    p_diff = sub.add_parser("diff")
+    p_diff.add_argument("old")
+    p_diff.add_argument("new")
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        session = SnapshotSession()
+        session.login()
+        session.switch_account()
+        session.export(args.zones, args.path)
+    elif args.cmd == "lookup":
+        with ZoneSnapshot(args.path) as snap:
+            try:
+                ipaddress.IPv4Address(args.key)
+                hits = snap.lookup_address(args.key)
+            except ValueError:
+                hits = snap.lookup_name(args.key)
+            for rec in hits:
+                print(json.dumps(rec))
+    else:
+        with ZoneSnapshot(args.old) as old, ZoneSnapshot(args.new) as new:
+            removed, added = diff_snapshots(old, new)
+            for rec in removed:
+                print(f"- {rec['name']} {rec['type']} {rec['rdata']} ttl={rec['ttl']}")
+            for rec in added:
+                print(f"+ {rec['name']} {rec['type']} {rec['rdata']} ttl={rec['ttl']}")
+            print(f"🧮 {len(removed)} removed, {len(added)} added")
@@ -1,9 +1,9 @@
 # -----------------------------
-# Look up Default DNS View
+# Look up the DNS View
 # -----------------------------
 data "bloxone_dns_views" "default_view" {
   filters = {
-    name = "default"
+    name = var.view_name
   }
 }
 
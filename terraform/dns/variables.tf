@@ -16,6 +16,12 @@ variable "app2_ip" {
   default     = "10.3.4.5"
 }
 
+variable "view_name" {
+  description = "DNS view holding the zone"
+  type        = string
+  default     = "default"
+}
+
 variable "zone_fqdn" {
   description = "DNS zone FQDN"
   type        = string
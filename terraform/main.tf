@@ -81,34 +81,13 @@ resource "time_sleep" "wait_for_core_network" {
 }
 
 ##############################################################################
-# Optimized EU-side Routes
+# Static route to the Connect inside CIDR (no segment route carries it).
+# The VPC-to-VPC routes are owned by scripts/cloudwan_route_propagator.py
+# (run it after every apply); the anycast /32 by route_monitor_lambda.py.
 ##############################################################################
 resource "aws_route" "eu_routes" {
   for_each = {
-    eu_to_us            = { rt = module.spoke_vpc_eu.route_table_id, dest = module.spoke_vpc_us.vpc_cidr }
-    eu_to_shared        = { rt = module.spoke_vpc_eu.route_table_id, dest = module.shared_vpc.vpc_cidr }
-    shared_to_spoke_eu  = { rt = module.shared_vpc.route_table_id,   dest = module.spoke_vpc_eu.vpc_cidr }
-    shared_to_spoke_us  = { rt = module.shared_vpc.route_table_id,   dest = module.spoke_vpc_us.vpc_cidr }
     shared_to_connect   = { rt = module.shared_vpc.route_table_id,   dest = "10.60.0.0/16" }
-    shared_to_anycast   = { rt = module.shared_vpc.route_table_id,   dest = "192.168.100.10/32" }  
-  }
-
-  depends_on             = [time_sleep.wait_for_core_network]
-  route_table_id         = each.value.rt
-  destination_cidr_block = each.value.dest
-  core_network_arn       = module.cloudwan.core_network_arn
-}
-
-##############################################################################
-# Optimized US-side Routes
-##############################################################################
-resource "aws_route" "us_routes" {
-  provider = aws.us-east-1
-
-  for_each = {
-    us_to_eu      = { rt = module.spoke_vpc_us.route_table_id, dest = module.spoke_vpc_eu.vpc_cidr }
-    us_to_shared  = { rt = module.spoke_vpc_us.route_table_id, dest = module.shared_vpc.vpc_cidr }
-    us_to_anycast = { rt = module.spoke_vpc_us.route_table_id, dest = "192.168.100.10/32" }
   }
 
   depends_on             = [time_sleep.wait_for_core_network]
@@ -143,7 +143,7 @@ resource "aws_networkmanager_vpc_attachment" "shared" {
   core_network_id = aws_networkmanager_core_network.core.id
   vpc_arn         = "arn:aws:ec2:eu-central-1:${data.aws_caller_identity.me.account_id}:vpc/${var.vpcs["shared"]}"
   subnet_arns     = var.subnet_arns_map["shared"]
-  tags            = var.tags
+  tags            = merge(var.tags, { segment = "dnsShared" })
 }
 
 resource "aws_networkmanager_vpc_attachment" "eu" {
@@ -151,7 +151,7 @@ resource "aws_networkmanager_vpc_attachment" "eu" {
   core_network_id = aws_networkmanager_core_network.core.id
   vpc_arn         = "arn:aws:ec2:eu-central-1:${data.aws_caller_identity.me.account_id}:vpc/${var.vpcs["eu_central_1"]}"
   subnet_arns     = var.subnet_arns_map["eu_central_1"]
-  tags            = var.tags
+  tags            = merge(var.tags, { segment = "vpcComm" })
 }
 
 resource "aws_networkmanager_vpc_attachment" "us" {
@@ -160,7 +160,7 @@ resource "aws_networkmanager_vpc_attachment" "us" {
   core_network_id = aws_networkmanager_core_network.core.id
   vpc_arn         = "arn:aws:ec2:us-east-1:${data.aws_caller_identity.me.account_id}:vpc/${var.vpcs["us_east_1"]}"
   subnet_arns     = var.subnet_arns_map["us_east_1"]
-  tags            = var.tags
+  tags            = merge(var.tags, { segment = "vpcComm" })
 }
 
 ##############################################################################
@@ -20,7 +20,35 @@ output "ssh_access_us" {
   value       = module.spoke_vpc_us.ssh_access
 }
 
+output "core_network_id" {
+  description = "Core network id (argument of scripts/cloudwan_route_propagator.py)"
+  value       = module.cloudwan.core_network_id
+}
+
 output "bgp_peering_details" {
   description = "All BGP peering details for NIOS-X to AWS"
   value       = module.cloudwan.connect_peer_bgp
 }
+
+output "ipam_inventory" {
+  description = "VPC CIDRs, subnets and host IPs per VPC (consumed by scripts/tf_ipam_importer.py)"
+  value = merge(
+    {
+      (var.shared_vpc["name"]) = {
+        cidr    = module.shared_vpc.vpc_cidr
+        subnets = [var.shared_vpc["subnet"]]
+        hosts = {
+          "${var.shared_vpc["name"]}-gm"   = var.shared_vpc["gm_ip"]
+          "${var.shared_vpc["name"]}-nios" = var.shared_vpc["nios_ip"]
+        }
+      }
+    },
+    {
+      for key, spoke in var.spokes : spoke.name => {
+        cidr    = spoke.cidr
+        subnets = [spoke.subnet]
+        hosts   = { (spoke.instance) = spoke.private_ip }
+      }
+    }
+  )
+}